@@ -0,0 +1,115 @@
+# audio_buffer.py
+
+import logging
+import numpy as np
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+class _Segment:
+    """A preallocated block of sample storage plus its fill and recording state."""
+    __slots__ = ('data', 'frames', 'start', 'recording', 'arm_requested')
+
+    def __init__(self, capacity_frames, channels, dtype):
+        self.data = np.empty((capacity_frames, channels), dtype=dtype)
+        self.frames = 0
+        self.start = 0
+        self.recording = False
+        self.arm_requested = False
+
+class AudioBuffer:
+    """
+    Fixed-capacity buffer for captured audio.
+
+    The PortAudio callback is the only writer: it copies each block into
+    preallocated storage and then publishes the new fill position, so no lock
+    and no per-block allocation is needed. Readers get ndarray views of the
+    filled region instead of concatenated copies.
+
+    While no recording is running the callback keeps writing, and the
+    storage holds the most recent `preroll_frames` of audio. Arming the
+    buffer starts the recording that many frames back, so the start of
+    speech that came before the hotkey is kept without copying it.
+    """
+    def __init__(self, capacity_frames=0, channels=1, dtype='float32'):
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.capacity_frames = capacity_frames
+        self.preroll_frames = 0
+        self.dropped_frames = 0
+        self._segment = _Segment(capacity_frames, channels, self.dtype)
+
+    def allocate(self, samplerate, channels, max_duration, dtype='float32', preroll_seconds=0.0):
+        """Sizes the buffer for the longest allowed recording plus the pre-roll."""
+        self.preroll_frames = int(samplerate * preroll_seconds)
+        # One extra second of headroom covers blocks that arrive before the
+        # timeout timer fires. Idle capture uses up to twice the pre-roll.
+        self.capacity_frames = int(samplerate * (max_duration + 1)) + 2 * self.preroll_frames
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.dropped_frames = 0
+        self._segment = _Segment(self.capacity_frames, channels, self.dtype)
+        logger.debug(
+            f"Allocated audio buffer for {self.capacity_frames} frames x {channels} channels "
+            f"({self._segment.data.nbytes / (1024 * 1024):.1f} MB), pre-roll {self.preroll_frames} frames."
+        )
+
+    def write(self, indata):
+        """Copies a block of frames into the buffer. Returns the number of frames written."""
+        segment = self._segment
+        if not segment.recording:
+            if segment.arm_requested:
+                # Only the writer moves idle audio, so the recording start is fixed here
+                segment.start = max(0, segment.frames - self.preroll_frames)
+                segment.recording = True
+            elif segment.frames >= 2 * self.preroll_frames:
+                # Keep the newest pre-roll at the front; source and target do not overlap
+                keep = self.preroll_frames
+                segment.data[:keep] = segment.data[segment.frames - keep:segment.frames]
+                segment.frames = keep
+        start = segment.frames
+        count = min(len(indata), self.capacity_frames - start)
+        if count > 0:
+            segment.data[start:start + count] = indata[:count]
+            # Publishing the position last keeps readers from seeing unwritten samples.
+            segment.frames = start + count
+        if count < len(indata) and segment.recording:
+            self.dropped_frames += len(indata) - max(count, 0)
+        return max(count, 0)
+
+    def arm(self):
+        """Starts a recording that begins with the buffered pre-roll."""
+        self.dropped_frames = 0
+        self._segment.arm_requested = True
+
+    def _recording_start(self, segment):
+        if segment.recording:
+            return segment.start
+        return max(0, segment.frames - self.preroll_frames)
+
+    def view(self):
+        """Returns a zero-copy view of the frames recorded so far, pre-roll included."""
+        segment = self._segment
+        return segment.data[self._recording_start(segment):segment.frames]
+
+    def take(self):
+        """
+        Returns the recorded frames as a flat view and starts a fresh segment.
+
+        Ownership of the returned storage passes to the caller, so the next
+        recording never overwrites audio that is still being transcribed.
+        """
+        segment = self._segment
+        self._segment = _Segment(self.capacity_frames, self.channels, self.dtype)
+        return segment.data[self._recording_start(segment):segment.frames].reshape(-1)
+
+    def clear(self):
+        """Discards the recording and returns to idle pre-roll capture."""
+        # Swapping in a new segment avoids racing the callback on the old one
+        self._segment = _Segment(self.capacity_frames, self.channels, self.dtype)
+        self.dropped_frames = 0
+
+    def __len__(self):
+        """Number of frames in the current recording, pre-roll included."""
+        segment = self._segment
+        return segment.frames - self._recording_start(segment)
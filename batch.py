@@ -0,0 +1,178 @@
+# batch.py
+
+"""
+Offline transcription of saved audio clips.
+
+Runs every WAV, FLAC or Opus (.ogg) file in a directory through the same preprocessing and
+backend as the app, spread over a pool of worker processes, and writes the
+results next to the inputs:
+
+    python batch.py transcribe DIR --format jsonl --processes 4
+
+With `--format jsonl` all results are appended to DIR/transcriptions.jsonl;
+with `--format txt` each clip gets a `.txt` file beside it. Interrupted runs resume where they stopped: files that
+already have a result are skipped.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+import soundfile as sf
+from config import load_config
+from preprocessing import preprocess_audio
+from capture import recording_format, to_recording_rate
+from transcription import load_transcription_backend
+from confidence import to_recording_time
+from state import correlation_id
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg')
+JSONL_NAME = 'transcriptions.jsonl'
+
+# Backend and configuration of this worker process
+_backend = None
+_config = None
+
+def find_audio_files(directory, recursive=False):
+    """Returns the audio files under `directory`, sorted, as paths relative to it."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        if not recursive:
+            dirs.clear()
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return found
+
+def text_path(directory, relative_path):
+    return os.path.join(directory, os.path.splitext(relative_path)[0] + '.txt')
+
+def completed_files(directory, files, output_format):
+    """Returns the files among `files` that already have a successful result."""
+    if output_format == 'txt':
+        return {path for path in files if os.path.exists(text_path(directory, path))}
+    completed = set()
+    jsonl_path = os.path.join(directory, JSONL_NAME)
+    if not os.path.exists(jsonl_path):
+        return completed
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line may be cut short if the previous run was killed
+                continue
+            if 'error' not in record:
+                completed.add(record['file'])
+    return {path for path in files if path.replace(os.sep, '/') in completed}
+
+def _init_worker(model_name, config):
+    global _backend, _config
+    _config = config
+    _backend = load_transcription_backend(model_name, config, correlation_id, in_process=True)
+
+def _transcribe_file(path):
+    """Runs in a worker process. Returns the text, the clip duration and the timed segments."""
+    samplerate = recording_format(_config)[0]
+    audio, file_samplerate = sf.read(path, dtype='float32')
+    # Clips saved at the device's native rate are converted like live capture
+    audio = to_recording_rate(audio, file_samplerate, samplerate)
+    processed, kept = preprocess_audio(audio, _config)
+    if not len(processed):
+        return '', len(audio) / samplerate, []
+    result = _backend.transcribe(processed)
+    return result.text.strip(), len(audio) / samplerate, to_recording_time(result.segments, kept, samplerate)
+
+def write_txt(path, text):
+    """Writes a transcript atomically through a temporary file."""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def transcribe_directory(directory, config, model_name, output_format, processes, recursive):
+    """Transcribes the pending files in `directory`. Returns the number of failures."""
+    files = find_audio_files(directory, recursive)
+    done = completed_files(directory, files, output_format)
+    pending = [path for path in files if path not in done]
+    print(f"{len(files)} files, {len(files) - len(pending)} already transcribed, {len(pending)} to go.", file=sys.stderr)
+    if not pending:
+        return 0
+
+    jsonl_file = open(os.path.join(directory, JSONL_NAME), 'a', encoding='utf-8') if output_format == 'jsonl' else None
+    failures = 0
+    finished = 0
+    start = time.perf_counter()
+    # Spawned workers do not inherit CUDA or Tk state from this process
+    executor = ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=mp.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(model_name, config)
+    )
+    try:
+        queue = iter(pending)
+        in_flight = {}
+        # Keep a bounded number of files in flight so thousands of clips are not queued at once
+        for path in queue:
+            in_flight[executor.submit(_transcribe_file, os.path.join(directory, path))] = path
+            if len(in_flight) >= processes * 2:
+                break
+        while in_flight:
+            completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                path = in_flight.pop(future)
+                record = {'file': path.replace(os.sep, '/'), 'model': model_name, 'timestamp': datetime.now().isoformat()}
+                try:
+                    text, duration, segments = future.result()
+                    record.update(text=text, duration_seconds=round(duration, 3), segments=segments)
+                    if output_format == 'txt':
+                        write_txt(text_path(directory, path), text)
+                except Exception as e:
+                    failures += 1
+                    record['error'] = str(e)
+                    print(f"Failed to transcribe {path}: {e}", file=sys.stderr)
+                if jsonl_file is not None:
+                    jsonl_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    jsonl_file.flush()
+                finished += 1
+                next_path = next(queue, None)
+                if next_path is not None:
+                    in_flight[executor.submit(_transcribe_file, os.path.join(directory, next_path))] = next_path
+            elapsed = time.perf_counter() - start
+            print(f"[{finished}/{len(pending)}] {finished / elapsed:.2f} files/s", file=sys.stderr)
+    finally:
+        executor.shutdown(cancel_futures=True)
+        if jsonl_file is not None:
+            jsonl_file.close()
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe saved audio clips without the GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    transcribe_parser = subparsers.add_parser('transcribe', help="Transcribe every WAV, FLAC or Opus (.ogg) file in a directory.")
+    transcribe_parser.add_argument('directory', help="Directory with the audio clips.")
+    transcribe_parser.add_argument('--config', help="Path to config.yaml (defaults to the one next to this script).")
+    transcribe_parser.add_argument('--model', help="Model name (defaults to model_support.default_model).")
+    transcribe_parser.add_argument('--format', choices=('jsonl', 'txt'), default='jsonl',
+                                   help=f"Append results to {JSONL_NAME} or write a .txt file per clip.")
+    transcribe_parser.add_argument('--processes', type=int, default=2, help="Worker processes, each with its own model.")
+    transcribe_parser.add_argument('--recursive', action='store_true', help="Include subdirectories.")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+    config = load_config(args.config)
+    model_name = args.model or config.get('model_support', {}).get('default_model', 'base')
+    failures = transcribe_directory(
+        args.directory, config, model_name, args.format, max(1, args.processes), args.recursive
+    )
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
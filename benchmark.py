@@ -0,0 +1,477 @@
+# benchmark.py
+
+"""
+Headless latency and throughput benchmark for the transcription pipeline.
+
+Feeds synthetic signals and any WAV/FLAC clips in the fixtures directory
+through the same preprocessing and backend as the app, without Tk, keyboard
+hooks or text injection, and writes per-stage timings as JSON:
+
+    python benchmark.py --model base --runs 5 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+from datetime import datetime
+import numpy as np
+import soundfile as sf
+import psutil
+from config import load_config
+from preprocessing import preprocess_audio
+from audio_buffer import AudioBuffer
+from capture import from_float32, recording_format, to_float32, to_recording_rate
+from logger import Redactor, configure_redaction, sanitize_message
+from transcription import _load_cached_whisper_model, create_backend, load_whisper_model
+from state import correlation_id
+from utils import get_absolute_path
+from waveform import WaveformRenderer
+
+AUDIO_EXTENSIONS = ('.wav', '.flac')
+
+def synthetic_fixtures(samplerate, seconds=10.0):
+    """Generates signals that exercise the pipeline without needing recorded speech."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t)
+    noise = 0.05 * rng.standard_normal(len(t))
+    # Tone bursts separated by quiet gaps, roughly like speech with pauses
+    bursts = tone * (np.sin(2 * np.pi * 0.5 * t) > 0) + 0.005 * rng.standard_normal(len(t))
+    return {
+        'silence': np.zeros(len(t), dtype=np.float32),
+        'tone': tone.astype(np.float32),
+        'noise': noise.astype(np.float32),
+        'tone_with_noise': (tone + noise).astype(np.float32),
+        'bursts_with_pauses': bursts.astype(np.float32),
+    }
+
+def load_fixture_files(fixtures_dir, samplerate):
+    """Loads clips from the fixtures directory as mono audio at `samplerate`."""
+    fixtures = {}
+    if not os.path.isdir(fixtures_dir):
+        return fixtures
+    for name in sorted(os.listdir(fixtures_dir)):
+        if not name.lower().endswith(AUDIO_EXTENSIONS):
+            continue
+        audio, file_samplerate = sf.read(os.path.join(fixtures_dir, name), dtype='float32')
+        fixtures[name] = to_recording_rate(audio, file_samplerate, samplerate)
+    return fixtures
+
+def peak_rss_mb():
+    """Returns the peak resident set size of this process in MB."""
+    memory_info = psutil.Process(os.getpid()).memory_info()
+    if hasattr(memory_info, 'peak_wset'):
+        return memory_info.peak_wset / (1024 * 1024)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def summarize(values):
+    """Mean and percentiles of a list of durations, in seconds."""
+    values = np.asarray(values)
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p90': float(np.percentile(values, 90)),
+        'p99': float(np.percentile(values, 99)),
+        'min': float(values.min()),
+        'max': float(values.max()),
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=get_absolute_path(''), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def run_pipeline(audio, backend, config):
+    """Runs one clip through preprocessing and inference. Returns the per-stage timings."""
+    timings = {}
+    start = time.perf_counter()
+    processed, _ = preprocess_audio(audio, config, timings)
+    inference_start = time.perf_counter()
+    if len(processed):
+        backend.transcribe(processed)
+    timings['inference'] = time.perf_counter() - inference_start
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+def benchmark_fixture(audio, backend, config, runs):
+    samplerate = recording_format(config)[0]
+    duration = len(audio) / samplerate
+    stage_times = {}
+    for _ in range(runs):
+        for stage, seconds in run_pipeline(audio, backend, config).items():
+            stage_times.setdefault(stage, []).append(seconds)
+    stages = {stage: summarize(values) for stage, values in stage_times.items()}
+    return {
+        'duration_seconds': duration,
+        'runs': runs,
+        'stages': stages,
+        'real_time_factor': stages['total']['p50'] / duration if duration else None,
+    }
+
+def benchmark_capture_conversion(samplerate, seconds, runs, block_frames=160):
+    """
+    Measures the capture buffer and the conversion to model input for each capture dtype.
+
+    The buffer is filled block by block like the audio callback does, then
+    the recording is converted into a preallocated float32 staging array.
+    `conversion_peak_bytes` is the memory allocated during that conversion.
+    """
+    signal = synthetic_fixtures(samplerate, seconds)['tone_with_noise']
+    staging = np.empty(len(signal), dtype=np.float32)
+    results = {}
+    for dtype in ('float32', 'int16'):
+        buffer = AudioBuffer()
+        buffer.allocate(samplerate, 1, seconds, dtype=dtype)
+        blocks = from_float32(signal, dtype).reshape(-1, 1)
+        buffer_bytes = buffer.capacity_frames * np.dtype(dtype).itemsize
+        conversion_times = []
+        peaks = []
+        for _ in range(runs):
+            buffer.arm()
+            for start in range(0, len(blocks), block_frames):
+                buffer.write(blocks[start:start + block_frames])
+            recording = buffer.take()
+            tracemalloc.start()
+            start = time.perf_counter()
+            to_float32(recording, staging)
+            conversion_times.append(time.perf_counter() - start)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        results[dtype] = {
+            'buffer_bytes': buffer_bytes,
+            'staging_bytes': staging.nbytes,
+            'conversion_seconds': summarize(conversion_times),
+            'conversion_peak_bytes': max(peaks),
+        }
+    return {'recording_seconds': seconds, 'dtypes': results}
+
+# Messages of the kind sanitize_message sees on error paths
+SANITIZER_MESSAGES = (
+    "Failed to open the audio stream: Invalid number of channels [PaErrorCode -9998]",
+    "Could not deliver to jane.doe@example.com after 3 attempts",
+    "Payment card 4111 1111 1111 1111 was declined; retry with 5500-0000-0000-0004",
+)
+
+# Inputs that made the previous patterns backtrack: long runs of word
+# characters without an '@', and long digit strings with and without separators
+SANITIZER_PATHOLOGICAL = {
+    'word_run': 'a',
+    'dotted_word_run': 'a.',
+    'digit_run': '1',
+    'spaced_digits': '1 ',
+}
+
+def benchmark_sanitizer(runs, sizes=(1000, 10000, 100000), calls=1000):
+    """
+    Times sanitize_message on typical messages and on pathological inputs of growing size.
+
+    For each pathological input, `growth` is the time ratio between the
+    largest and smallest size divided by their length ratio: about 1 means
+    the scan is linear in the message length.
+    """
+    typical = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(calls):
+            for message in SANITIZER_MESSAGES:
+                sanitize_message(message)
+        typical.append((time.perf_counter() - start) / (calls * len(SANITIZER_MESSAGES)))
+    pathological = {}
+    for name, unit in SANITIZER_PATHOLOGICAL.items():
+        timings = {}
+        for size in sizes:
+            message = unit * (size // len(unit))
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                sanitize_message(message)
+                samples.append(time.perf_counter() - start)
+            timings[size] = min(samples)
+        pathological[name] = {
+            'seconds_by_length': timings,
+            'growth': (timings[sizes[-1]] / timings[sizes[0]]) / (sizes[-1] / sizes[0]),
+        }
+    return {'typical_seconds_per_call': summarize(typical), 'pathological': pathological}
+
+# A user pattern with inner groups, followed by more, so a wrong group
+# mapping would name the replacement after the wrong pattern; then a global
+# inline flag and a numbered backreference, which only work once rewritten
+# for their place in the combined alternation
+SANITIZER_USER_PATTERNS = {
+    'api_key': r'(sk|pk)-([A-Za-z0-9]{20,})',
+    'ticket': r'TICKET-\d+',
+    'secret': r'(?i)secret\w+',
+    'doubled': r'\b([a-z]+)-\1\b',
+}
+
+# Pattern sets Redactor must reject with ValueError instead of re.error
+SANITIZER_INVALID_PATTERNS = (
+    {'unbalanced': r'(sk-'},
+    {'first': r'(?P<key>a+)', 'second': r'(?P<key>b+)'},
+)
+
+# (message, expected output) with the default and user patterns configured
+SANITIZER_CASES = (
+    ("Could not deliver to jane.doe@example.com after 3 attempts",
+     "Could not deliver to [REDACTED EMAIL] after 3 attempts"),
+    ("Card 4111 1111 1111 1111 was declined; retry with 5500-0000-0000-0004",
+     "Card [REDACTED CREDIT_CARD] was declined; retry with [REDACTED CREDIT_CARD]"),
+    ("Rejected key sk-abcdefghijklmnopqrstuvwx for TICKET-42",
+     "Rejected key [REDACTED API_KEY] for [REDACTED TICKET]"),
+    ("Found SecretValue9 in a file, with xyz-xyz next to xyz-abc",
+     "Found [REDACTED SECRET] in a file, with [REDACTED DOUBLED] next to xyz-abc"),
+    ("Invalid number of channels [PaErrorCode -9998]",
+     "Invalid number of channels [PaErrorCode -9998]"),
+)
+
+def check_sanitizer(runs, max_growth=3.0):
+    """
+    Checks redaction output and that pathological inputs are scanned in linear time.
+
+    Returns the sanitizer benchmark with a list of `problems`, empty when
+    every check passes. Needs no model.
+    """
+    configure_redaction(SANITIZER_USER_PATTERNS)
+    problems = []
+    for message, expected in SANITIZER_CASES:
+        redacted = sanitize_message(message)
+        if redacted != expected:
+            problems.append(f"{message!r} was redacted to {redacted!r}, expected {expected!r}")
+    for patterns in SANITIZER_INVALID_PATTERNS:
+        try:
+            Redactor(patterns)
+            problems.append(f"{patterns!r} was accepted")
+        except ValueError:
+            pass
+        except re.error as e:
+            problems.append(f"{patterns!r} raised re.error instead of ValueError: {e}")
+    report = benchmark_sanitizer(runs, sizes=(10000, 100000))
+    for name, result in report['pathological'].items():
+        if result['growth'] > max_growth:
+            problems.append(f"'{name}' input grows {result['growth']:.1f}x faster than its length")
+    report['problems'] = problems
+    return report
+
+def check_whisper_cache(model_name):
+    """
+    Loads `model_name` into an empty weight cache, then back from that cache.
+
+    The cached load is called directly, so a failure is reported instead of
+    falling back to whisper.load_model. Its weights, its rebuilt
+    non-persistent buffers and its transcription of a fixture must match the
+    normally loaded model. Returns the timings and a list of `problems`.
+    """
+    import torch
+    problems = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        reference = load_whisper_model(model_name, correlation_id, cache_dir)
+        load_seconds = time.perf_counter() - start
+        cached_path = os.path.join(cache_dir, f"whisper_{model_name}.pt")
+        if not os.path.exists(cached_path):
+            return {'model': model_name, 'problems': [f"no cached checkpoint was written to {cached_path}"]}
+        start = time.perf_counter()
+        try:
+            cached = _load_cached_whisper_model(model_name, cached_path, str(reference.device))
+        except Exception as e:
+            return {'model': model_name, 'problems': [f"cached load failed: {e}"]}
+        cached_load_seconds = time.perf_counter() - start
+        expected = dict(reference.named_parameters())
+        expected.update(reference.named_buffers())
+        actual = dict(cached.named_parameters())
+        actual.update(cached.named_buffers())
+        for name, tensor in expected.items():
+            if name not in actual:
+                problems.append(f"'{name}' is missing from the cached model")
+            elif not torch.equal(tensor.to_dense() if tensor.is_sparse else tensor, actual[name].to_dense() if actual[name].is_sparse else actual[name]):
+                problems.append(f"'{name}' differs from the normally loaded model")
+        audio = synthetic_fixtures(16000, seconds=3.0)['bursts_with_pauses']
+        texts = [model.transcribe(audio, fp16=False, temperature=0.0)['text'] for model in (reference, cached)]
+        if texts[0] != texts[1]:
+            problems.append(f"transcriptions differ: {texts[0]!r} and {texts[1]!r}")
+    return {'model': model_name, 'load_seconds': load_seconds, 'cached_load_seconds': cached_load_seconds, 'problems': problems}
+
+class _HeadlessCanvas:
+    """Stands in for tk.Canvas so the waveform envelope can be checked without a display."""
+    def __init__(self, *args, **kwargs):
+        self._next_item = 0
+
+    def _create(self, *args, **kwargs):
+        self._next_item += 1
+        return self._next_item
+
+    create_line = create_text = _create
+
+    def bind(self, *args):
+        pass
+
+    def delete(self, item):
+        pass
+
+    def coords(self, item, *args):
+        pass
+
+    def itemconfig(self, item, **kwargs):
+        pass
+
+def check_waveform(samplerate=16000, seconds=30.0, block_frames=1600):
+    """
+    Feeds the same signal to the waveform renderer as float32 and as int16.
+
+    The envelope and the auto-gain peak must agree within int16 resolution,
+    including after the timeline zooms out, and quiet int16 input must stay
+    on the peak floor. Needs no model and no display. Returns a list of
+    `problems`.
+    """
+    problems = []
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    loud = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    quiet = np.random.default_rng(0).normal(0, 0.002, len(t)).astype(np.float32)
+    with mock.patch('waveform.tk.Canvas', _HeadlessCanvas):
+        for name, signal in (('loud', loud), ('quiet', quiet)):
+            renderers = {}
+            for dtype in (np.float32, np.int16):
+                samples = from_float32(signal, dtype)
+                renderer = WaveformRenderer(None, samplerate)
+                for end in range(block_frames, len(samples) + block_frames, block_frames):
+                    renderer.update(samples[:end])
+                renderers[np.dtype(dtype).name] = renderer
+            expected, actual = renderers['float32'], renderers['int16']
+            tolerance = 2.0 / 32768
+            if abs(actual.peak - expected.peak) > tolerance:
+                problems.append(f"'{name}' int16 peak is {actual.peak}, float32 peak is {expected.peak}")
+            if (not np.allclose(actual.mins, expected.mins, atol=tolerance)
+                    or not np.allclose(actual.maxs, expected.maxs, atol=tolerance)):
+                problems.append(f"'{name}' int16 envelope differs from the float32 envelope")
+            if expected.samples_per_column == actual.samples_per_column == WaveformRenderer(None, samplerate).samples_per_column:
+                problems.append(f"'{name}' did not exercise the zoom out")
+    quiet_peak = renderers['int16'].peak
+    if quiet_peak != 0.05:
+        problems.append(f"quiet int16 input moved the peak off its 0.05 floor to {quiet_peak}")
+    return {'problems': problems}
+
+# Slow to import and kept off the path to the first window; if the profile
+# shows one of them imported eagerly, startup has regressed
+DEFERRED_MODULES = ('torch', 'whisper', 'faster_whisper', 'noisereduce', 'pyautogui', 'matplotlib')
+
+def profile_imports(module='main', top=15):
+    """
+    Imports `module` in a fresh interpreter under `-X importtime`.
+
+    Reports the total import time, the slowest imports by cumulative time and
+    any deferred module that was imported eagerly.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    imported = {name for name, _, _ in entries}
+    return {
+        'module': module,
+        'error': completed.stderr.strip().splitlines()[-1] if completed.returncode else None,
+        'total_seconds': sum(self_us for _, self_us, _ in entries) / 1e6,
+        'slowest': [
+            {'module': name, 'cumulative_seconds': cumulative_us / 1e6}
+            for name, _, cumulative_us in sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+        ],
+        'eager_deferred_modules': [name for name in DEFERRED_MODULES if name in imported],
+    }
+
+def run_benchmark(config, model_name, runs, fixtures_dir):
+    samplerate = recording_format(config)[0]
+    backend = create_backend(model_name, config, correlation_id)
+    start = time.perf_counter()
+    backend.load()
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    backend.warmup()
+    warmup_seconds = time.perf_counter() - start
+
+    fixtures = synthetic_fixtures(samplerate)
+    fixtures.update(load_fixture_files(fixtures_dir, samplerate))
+    results = {name: benchmark_fixture(audio, backend, config, runs) for name, audio in fixtures.items()}
+    backend.close()
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'model': model_name,
+        'backend': backend.name,
+        'use_fp16': config.get('use_fp16', False),
+        'noise_reduction': config.get('enable_noise_reduction', True),
+        'vad': config.get('vad', {}).get('enabled', True),
+        'load_seconds': load_seconds,
+        'warmup_seconds': warmup_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'fixtures': results,
+        'capture_conversion': benchmark_capture_conversion(samplerate, config.get('max_recording_duration', 60), runs),
+        'sanitize_message': benchmark_sanitizer(runs),
+        'startup_imports': profile_imports(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the transcription pipeline without the GUI.")
+    parser.add_argument('--config', help="Path to config.yaml (defaults to the one next to this script).")
+    parser.add_argument('--model', help="Model name (defaults to model_support.default_model).")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per fixture.")
+    parser.add_argument('--fixtures', default=get_absolute_path('benchmark_fixtures'),
+                        help="Directory with extra WAV/FLAC clips at the configured sample rate.")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+    parser.add_argument('--imports-only', action='store_true',
+                        help="Only profile the imports that run before the window appears; needs no model.")
+    parser.add_argument('--sanitizer-only', action='store_true',
+                        help="Only check log redaction output and its scaling on pathological inputs; needs no model. "
+                             "Exits with status 1 if a check fails.")
+    parser.add_argument('--whisper-cache-only', action='store_true',
+                        help="Only check that a Whisper model loads from the memory-mapped weight cache without falling back "
+                             "(uses --model, default tiny). Exits with status 1 if a check fails.")
+    parser.add_argument('--waveform-only', action='store_true',
+                        help="Only check that the live waveform scales int16 and float32 capture alike; needs no model "
+                             "or display. Exits with status 1 if a check fails.")
+    args = parser.parse_args(argv)
+
+    if args.imports_only:
+        report = profile_imports()
+    elif args.sanitizer_only:
+        report = check_sanitizer(args.runs)
+    elif args.whisper_cache_only:
+        report = check_whisper_cache(args.model or 'tiny')
+    elif args.waveform_only:
+        report = check_waveform()
+    else:
+        config = load_config(args.config)
+        configure_redaction(config.get('Logging', {}).get('redact_patterns', {}))
+        model_name = args.model or config.get('model_support', {}).get('default_model', 'base')
+        report = run_benchmark(config, model_name, args.runs, args.fixtures)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    if report.get('problems'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# capture.py
+
+import logging
+from math import gcd
+import numpy as np
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Rate and channel count of the recordings handed to the pipeline when
+# capture.resample is enabled; this is what the transcription models expect
+PIPELINE_SAMPLERATE = 16000
+PIPELINE_CHANNELS = 1
+
+def to_float32(audio, out=None):
+    """
+    Returns audio as float32 in [-1, 1).
+
+    Integer PCM is scaled in a single pass, into `out` when it is given and
+    large enough. float32 input is returned as is, without a copy.
+    """
+    if audio.dtype == np.float32:
+        return audio
+    if out is None or len(out) < len(audio):
+        out = np.empty(audio.shape, dtype=np.float32)
+    else:
+        out = out[:len(audio)].reshape(audio.shape)
+    if np.issubdtype(audio.dtype, np.integer):
+        np.multiply(audio, np.float32(1.0 / -np.iinfo(audio.dtype).min), out=out, dtype=np.float32)
+    else:
+        out[...] = audio
+    return out
+
+def from_float32(samples, dtype):
+    """Converts float samples in [-1, 1) to the buffer dtype, scaling and clipping for integer PCM."""
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.integer):
+        return samples.astype(dtype, copy=False)
+    info = np.iinfo(dtype)
+    scaled = np.rint(samples * -float(info.min))
+    return np.clip(scaled, info.min, info.max, out=scaled).astype(dtype)
+
+def capture_dtype(config):
+    """Returns the sample type the recording buffer stores: float32 or int16 (half the memory)."""
+    return np.dtype(config.get('dtype', 'float32'))
+
+def recording_format(config):
+    """Returns the sample rate and channel count of recorded audio after capture."""
+    if config.get('capture', {}).get('resample', True):
+        return PIPELINE_SAMPLERATE, PIPELINE_CHANNELS
+    return config.get('samplerate', 16000), config.get('channels', 1)
+
+def device_format(device_info, config):
+    """Returns the sample rate and channel count to open the input device with."""
+    capture_config = config.get('capture', {})
+    if not capture_config.get('resample', True):
+        return config.get('samplerate', 16000), config.get('channels', 1)
+    samplerate = capture_config.get('device_samplerate') or int(device_info['default_samplerate'])
+    channels = capture_config.get('device_channels') or max(1, int(device_info['max_input_channels']))
+    return samplerate, channels
+
+class StreamingResampler:
+    """
+    Downmixes and resamples audio blocks as they are captured.
+
+    A Kaiser-windowed sinc low-pass is split into `up` polyphase branches, so
+    each output sample costs one short dot product and no upsampled signal is
+    ever built. The tail of each block is kept as filter history, so blocks of
+    any size can be fed and the result is the same as resampling the whole
+    recording at once, minus a fixed delay of about a millisecond.
+    """
+    def __init__(self, input_rate, output_rate, output_dtype='float32', zero_crossings=16, kaiser_beta=5.0):
+        divisor = gcd(int(input_rate), int(output_rate))
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.output_dtype = np.dtype(output_dtype)
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+        factor = max(self.up, self.down)
+        half_length = zero_crossings * factor
+        n = np.arange(-half_length, half_length + 1)
+        # Cut off at the lower of the two Nyquist rates; the gain of `up`
+        # makes up for the zeros a plain upsampler would insert
+        taps = np.sinc(n / factor) / factor * np.kaiser(len(n), kaiser_beta) * self.up
+        self.taps_per_phase = -(-len(taps) // self.up)
+        padded = np.zeros(self.taps_per_phase * self.up)
+        padded[:len(taps)] = taps
+        # phases[p, k] is the tap applied to input sample base - k for phase p
+        self.phases = padded.reshape(self.taps_per_phase, self.up).T.astype(np.float32)
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._offsets = np.arange(self.taps_per_phase)
+        self._inputs_seen = 0
+        self._next_output = 0
+
+    @property
+    def passthrough(self):
+        return self.up == self.down
+
+    def process(self, block):
+        """Takes a (frames, channels) block and returns the resampled mono samples as (frames, 1)."""
+        if self.passthrough and block.shape[1] == 1 and block.dtype == self.output_dtype:
+            return block
+        samples = to_float32(block)
+        mono = samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1)
+        if self.passthrough:
+            return from_float32(mono, self.output_dtype).reshape(-1, 1)
+        extended = np.concatenate((self._history, mono))
+        # Global index of extended[0]
+        origin = self._inputs_seen - len(self._history)
+        self._inputs_seen += len(mono)
+        last_output = (self._inputs_seen * self.up - 1) // self.down
+        outputs = np.arange(self._next_output, last_output + 1)
+        self._next_output = last_output + 1
+        self._history = extended[len(extended) - len(self._history):]
+        if len(outputs) == 0:
+            return np.empty((0, 1), dtype=self.output_dtype)
+        positions = outputs * self.down
+        bases = positions // self.up
+        samples = extended[(bases - origin)[:, None] - self._offsets]
+        resampled = np.einsum('ij,ij->i', self.phases[positions % self.up], samples)
+        return from_float32(resampled, self.output_dtype).reshape(-1, 1)
+
+def to_recording_rate(audio, file_samplerate, samplerate):
+    """Downmixes audio read from a file to mono and resamples it to `samplerate`, as capture does."""
+    block = audio.reshape(len(audio), -1)
+    return StreamingResampler(file_samplerate, samplerate).process(block).reshape(-1)
@@ -0,0 +1,126 @@
+# confidence.py
+
+import logging
+from state import correlation_id
+from transcription import TranscriptionResult
+from vad import map_to_original
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+def is_low_confidence(segment, confidence_config):
+    """True when the model was unsure of a segment that most likely does contain speech."""
+    avg_logprob = segment.get('avg_logprob')
+    if avg_logprob is None:
+        return False
+    if (segment.get('no_speech_prob') or 0.0) > confidence_config.get('max_no_speech_prob', 0.6):
+        # Probably noise; a larger model would not find words there either
+        return False
+    return avg_logprob < confidence_config.get('min_avg_logprob', -1.0)
+
+def low_confidence_spans(segments, confidence_config):
+    """Returns (first, last) indexes of runs of adjacent low-confidence segments."""
+    spans = []
+    for index, segment in enumerate(segments):
+        if not is_low_confidence(segment, confidence_config):
+            continue
+        if spans and spans[-1][1] == index - 1:
+            spans[-1] = (spans[-1][0], index)
+        else:
+            spans.append((index, index))
+    return spans
+
+def _mean_logprob(segments):
+    values = [segment['avg_logprob'] for segment in segments if segment.get('avg_logprob') is not None]
+    return sum(values) / len(values) if values else float('-inf')
+
+def _midpoint(item):
+    return (item['start'] + item['end']) / 2
+
+def _trim(segments, begin, end):
+    """
+    Drops what a candidate decode heard in the padding around a span.
+
+    Words whose midpoint lies outside [begin, end] belong to the confident
+    neighbours and are removed. Segments without word timings are kept or
+    dropped whole by the same rule.
+    """
+    trimmed = []
+    for segment in segments:
+        words = segment.get('words')
+        if not words:
+            if begin <= _midpoint(segment) <= end:
+                trimmed.append(segment)
+            continue
+        kept = [word for word in words if begin <= _midpoint(word) <= end]
+        if not kept:
+            continue
+        if len(kept) < len(words):
+            segment = dict(segment, start=kept[0]['start'], end=kept[-1]['end'], words=kept, text=''.join(word['word'] for word in kept))
+        trimmed.append(segment)
+    return trimmed
+
+def _shift(segment, offset, model_name):
+    shifted = dict(segment)
+    shifted['start'] = segment['start'] + offset
+    shifted['end'] = segment['end'] + offset
+    if segment.get('words'):
+        shifted['words'] = [dict(word, start=word['start'] + offset, end=word['end'] + offset) for word in segment['words']]
+    shifted['redecoded_by'] = model_name
+    return shifted
+
+def redecode(result, audio, samplerate, backend, confidence_config):
+    """
+    Decodes the low-confidence segments of `result` again with `backend`.
+
+    Adjacent low-confidence segments are decoded together, with
+    `padding_seconds` of audio on either side for context; whatever the new
+    decode places in that padding is dropped, using its word timings. A span
+    is only replaced when the new decode is more confident than the old one.
+    Returns the updated result and the number of spans replaced.
+    """
+    padding = int(confidence_config.get('padding_seconds', 0.2) * samplerate)
+    segments = list(result.segments)
+    replaced = 0
+    # Back to front, so replacing a span does not shift the indexes of earlier ones
+    for first, last in reversed(low_confidence_spans(segments, confidence_config)):
+        start = max(0, int(segments[first]['start'] * samplerate) - padding)
+        end = min(len(audio), int(segments[last]['end'] * samplerate) + padding)
+        if end <= start:
+            continue
+        offset = start / samplerate
+        candidate = _trim(
+            backend.transcribe(audio[start:end]).segments,
+            segments[first]['start'] - offset,
+            segments[last]['end'] - offset
+        )
+        if not candidate or _mean_logprob(candidate) <= _mean_logprob(segments[first:last + 1]):
+            continue
+        segments[first:last + 1] = [_shift(segment, offset, backend.model_name) for segment in candidate]
+        replaced += 1
+    if not replaced:
+        return result, 0
+    text = ''.join(segment['text'] for segment in segments)
+    logger.info(f"Re-decoded {replaced} low-confidence span(s) with '{backend.model_name}'.", extra={'correlation_id': correlation_id})
+    return TranscriptionResult(text, segments, result.language), replaced
+
+def to_recording_time(segments, kept, samplerate):
+    """
+    Maps segment and word times from the trimmed model input back to the recording.
+
+    `kept` holds the (start, end) sample offsets silence trimming kept, as
+    returned by preprocess_audio. Times are rounded to milliseconds.
+    """
+    def recording_seconds(seconds):
+        return round(map_to_original(int(seconds * samplerate), kept) / samplerate, 3)
+
+    mapped = []
+    for segment in segments:
+        segment = dict(segment, start=recording_seconds(segment['start']), end=recording_seconds(segment['end']))
+        if segment.get('words'):
+            segment['words'] = [
+                dict(word, start=recording_seconds(word['start']), end=recording_seconds(word['end']))
+                for word in segment['words']
+            ]
+        mapped.append(segment)
+    return mapped
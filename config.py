@@ -3,9 +3,14 @@
 import yaml
 import os
 import logging
+import threading
+from collections.abc import Mapping
 from utils import get_absolute_path
 from state import correlation_id
 from logger import sanitize_message
+from capture import capture_dtype, recording_format
+from scheduler import OVERLOAD_POLICIES
+from transcription import BACKENDS
 
 # Set up module-specific logger
 logger = logging.getLogger(__name__)
@@ -14,9 +19,184 @@ class ConfigError(Exception):
     """Custom exception for configuration errors."""
     pass
 
-def load_config():
-    """Loads and validates the configuration from config.yaml."""
-    config_path = get_absolute_path('config.yaml')
+# Same as hotkey.HOTKEY_MODES, which cannot be imported here without installing the keyboard hook library
+_HOTKEY_MODES = ('toggle', 'hold')
+_LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+REQUIRED_FIELDS = (
+    'model_support',
+    'key_combination',
+    'samplerate',
+    'channels',
+    'dtype',
+    'gui_settings',
+    'Logging',
+    'enable_noise_reduction',
+    'max_recording_duration',
+    'LogCleanup',
+)
+
+# Checked when present: (dotted path, accepted types, check, what the check expects)
+SCHEMA = (
+    ('samplerate', int, lambda v: 8000 <= v <= 192000, "between 8000 and 192000"),
+    ('channels', int, lambda v: 1 <= v <= 32, "between 1 and 32"),
+    ('dtype', str, lambda v: v in ('float32', 'int16'), "float32 or int16"),
+    ('max_recording_duration', (int, float), lambda v: 0 < v <= 3600, "between 0 and 3600 seconds"),
+    ('preroll_seconds', (int, float), lambda v: 0 <= v <= 10, "between 0 and 10 seconds"),
+    ('audio_device_index', (int, type(None)), lambda v: v is None or v >= 0, "a device index of 0 or more, or null for the default device"),
+    ('enable_noise_reduction', bool, None, None),
+    ('key_combination', list, lambda v: len(v) > 0 and all(isinstance(key, str) and key for key in v), "a non-empty list of key names"),
+    ('hotkey_mode', str, lambda v: v in _HOTKEY_MODES, " or ".join(_HOTKEY_MODES)),
+    ('hotkey_debounce', (int, float), lambda v: 0 <= v <= 1, "between 0 and 1 second"),
+    ('save_directory', str, lambda v: bool(v), "a directory path"),
+    ('model_support', dict, None, None),
+    ('model_support.default_model', str, lambda v: bool(v), "a model name"),
+    ('model_support.backend', str, lambda v: v in BACKENDS, " or ".join(BACKENDS)),
+    ('gui_settings', dict, None, None),
+    ('gui_settings.always_on_top', bool, None, None),
+    ('gui_settings.history_max_entries', int, lambda v: v >= 1, "1 or more"),
+    ('gui_settings.history_page_size', int, lambda v: v >= 1, "1 or more"),
+    ('Logging', dict, None, None),
+    ('Logging.log_level', str, lambda v: v.upper() in _LOG_LEVELS, ", ".join(_LOG_LEVELS)),
+    ('Logging.console_log_level', str, lambda v: v.upper() in _LOG_LEVELS, ", ".join(_LOG_LEVELS)),
+    ('Logging.queue_size', int, lambda v: v >= 1, "1 or more"),
+    ('LogCleanup', dict, None, None),
+    ('LogCleanup.retention_days', int, lambda v: v >= 0, "0 or more"),
+    ('LogCleanup.max_log_files', int, lambda v: v >= 1, "1 or more"),
+    ('capture.resample', bool, None, None),
+    ('transcription_queue.workers', int, lambda v: 1 <= v <= 16, "between 1 and 16"),
+    ('transcription_queue.max_queued', int, lambda v: v >= 1, "1 or more"),
+    ('transcription_queue.shutdown_timeout', (int, float), lambda v: v >= 0, "0 or more seconds"),
+    ('transcription_queue.overload_policy', str, lambda v: v in OVERLOAD_POLICIES, " or ".join(OVERLOAD_POLICIES)),
+    ('result_cache.max_size_mb', (int, float), lambda v: v > 0, "more than 0"),
+    ('config_reload.interval', (int, float), lambda v: v > 0, "more than 0 seconds"),
+    ('confidence.word_timestamps', bool, None, None),
+    ('confidence.min_avg_logprob', (int, float), lambda v: v <= 0, "0 or less"),
+    ('confidence.max_no_speech_prob', (int, float), lambda v: 0 <= v <= 1, "between 0 and 1"),
+    ('confidence.padding_seconds', (int, float), lambda v: 0 <= v <= 5, "between 0 and 5 seconds"),
+    ('confidence.redecode_model', (str, type(None)), lambda v: v is None or bool(v), "a model name or null"),
+)
+
+_MISSING = object()
+
+def _lookup(config, path):
+    value = config
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def validate_config(config):
+    """Checks required fields and the types and ranges in SCHEMA; raises ConfigError listing every problem."""
+    if not isinstance(config, dict):
+        raise ConfigError("The configuration file must contain a mapping of settings.")
+    problems = [f"missing required field '{field}'" for field in REQUIRED_FIELDS if field not in config]
+    for path, types, check, expected in SCHEMA:
+        value = _lookup(config, path)
+        if value is _MISSING:
+            continue
+        # bool is an int subclass, but True is not a valid sample rate
+        if not isinstance(value, types) or (isinstance(value, bool) and types is not bool):
+            names = ' or '.join(t.__name__ for t in (types if isinstance(types, tuple) else (types,)))
+            problems.append(f"'{path}' must be of type {names}, not {type(value).__name__}")
+        elif check is not None and not check(value):
+            problems.append(f"'{path}' must be {expected}, not {value!r}")
+    if problems:
+        raise ConfigError("Invalid configuration: " + "; ".join(problems))
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return Section(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _thaw(value):
+    if isinstance(value, Section):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+class Section(Mapping):
+    """A read-only configuration mapping; nested mappings are Sections and lists are tuples."""
+    def __init__(self, data):
+        object.__setattr__(self, '_data', {key: _freeze(value) for key, value in data.items()})
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only; load a new snapshot to change them.")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._data!r})"
+
+    def thaw(self):
+        """Returns a plain, mutable copy, e.g. to edit and save."""
+        return _thaw(self)
+
+class Settings(Section):
+    """
+    A validated, immutable snapshot of config.yaml.
+
+    Snapshots are never changed, only replaced, so any thread can keep using
+    the one it holds. Values read on every recording are resolved once into
+    attributes instead of being looked up in nested mappings each time.
+    """
+    def __init__(self, data):
+        super().__init__(data)
+        resolved = {
+            'recording_samplerate': recording_format(self)[0],
+            'recording_channels': recording_format(self)[1],
+            'capture_dtype': capture_dtype(self),
+            'device_index': self.get('audio_device_index'),
+            'model_name': self.get('model_support', {}).get('default_model', 'base'),
+            'key_combination': self.get('key_combination', ('ctrl', 'alt', 'space')),
+            'hotkey_mode': self.get('hotkey_mode', 'toggle'),
+            'save_directory': self.get('save_directory', 'transcriptions'),
+        }
+        for name, value in resolved.items():
+            object.__setattr__(self, name, value)
+
+def changed_settings(old, new):
+    """Returns the top-level keys, and 'section.key' paths inside sections, whose values differ."""
+    changed = set()
+    for key in set(old) | set(new):
+        old_value, new_value = old.get(key), new.get(key)
+        if old_value == new_value:
+            continue
+        changed.add(key)
+        if isinstance(old_value, Mapping) and isinstance(new_value, Mapping):
+            changed.update(
+                f"{key}.{name}" for name in set(old_value) | set(new_value)
+                if old_value.get(name) != new_value.get(name)
+            )
+    return changed
+
+# Parsed snapshots by path, with the modification time and size they were read at
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _file_signature(config_path):
+    status = os.stat(config_path)
+    return status.st_mtime_ns, status.st_size
+
+def load_config(config_path=None):
+    """
+    Loads and validates the configuration from config.yaml, or from `config_path` if given.
+
+    Returns a Settings snapshot. The file is only parsed again once its
+    modification time or size changes.
+    """
+    config_path = config_path or get_absolute_path('config.yaml')
     if not os.path.exists(config_path):
         logger.error(
             f"Configuration file not found at {config_path}",
@@ -24,6 +204,12 @@ def load_config():
         )
         raise ConfigError(f"Configuration file not found at {config_path}")
 
+    signature = _file_signature(config_path)
+    with _cache_lock:
+        cached = _cache.get(config_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     with open(config_path, 'r') as file:
         try:
             config = yaml.safe_load(file)
@@ -37,35 +223,22 @@ def load_config():
             )
             raise ConfigError(f"Error parsing configuration file: {e}")
 
-    # Perform validation checks
-    required_fields = [
-        'model_support',
-        'key_combination',
-        'samplerate',
-        'channels',
-        'dtype',
-        'gui_settings',
-        'Logging',
-        'enable_noise_reduction',
-        'max_recording_duration',
-        'LogCleanup'
-    ]
-
-    for field in required_fields:
-        if field not in config:
-            logger.error(
-                f"Missing required configuration field: {field}",
-                extra={'correlation_id': correlation_id}
-            )
-            raise ConfigError(f"Missing required configuration field: {field}")
-
-    # Additional validations can be added here
+    try:
+        validate_config(config)
+    except ConfigError as e:
+        logger.error(str(e), extra={'correlation_id': correlation_id})
+        raise
 
-    return config
+    settings = Settings(config)
+    with _cache_lock:
+        _cache[config_path] = (signature, settings)
+    return settings
 
 def save_config(config):
     """Saves the configuration to config.yaml."""
     config_path = get_absolute_path('config.yaml')
+    if isinstance(config, Section):
+        config = config.thaw()
     try:
         with open(config_path, 'w') as file:
             yaml.safe_dump(config, file)
@@ -78,3 +251,46 @@ def save_config(config):
             exc_info=True
         )
         raise ConfigError(f"Failed to save configuration: {e}")
+
+class ConfigWatcher:
+    """
+    Watches config.yaml and hands each new, valid snapshot to `on_change`.
+
+    The file's modification time and size are polled every `interval`
+    seconds. A file that fails to parse or validate is logged and skipped;
+    the previous snapshot stays in effect until the file is fixed.
+    """
+    def __init__(self, on_change, config_path=None, interval=1.0):
+        self.on_change = on_change
+        self.config_path = config_path or get_absolute_path('config.yaml')
+        self.interval = interval
+        self._stop = threading.Event()
+        try:
+            self._signature = _file_signature(self.config_path)
+        except OSError:
+            self._signature = None
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                signature = _file_signature(self.config_path)
+            except OSError:
+                # Editors may replace the file by deleting and recreating it
+                continue
+            if signature == self._signature:
+                continue
+            self._signature = signature
+            try:
+                settings = load_config(self.config_path)
+            except ConfigError as e:
+                logger.warning(
+                    f"Ignoring configuration change: {sanitize_message(str(e))}",
+                    extra={'correlation_id': correlation_id}
+                )
+                continue
+            self.on_change(settings)
+
+    def stop(self):
+        self._stop.set()
@@ -4,19 +4,20 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
 import logging
+from collections import deque
 from preferences import PreferencesWindow
 from utils import get_absolute_path, create_tooltip
 from config import load_config
-import pyautogui
-import numpy as np
+from capture import recording_format
 from datetime import datetime
 import soundfile as sf
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from state import lock, should_exit, audio_buffer
+from state import should_exit, audio_buffer
 import os
 from transcription import load_whisper_model
 from logger import sanitize_message, set_log_level
+from waveform import WaveformRenderer
+from history import TranscriptHistory
+from confidence import is_low_confidence
 
 # Set up module-specific logger
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class TranscriptionGUI:
     def __init__(
         self, root, config, model, stop_recording_callback,
         correlation_id, trace_id, on_model_change_callback,
-        graceful_shutdown_callback
+        graceful_shutdown_callback, model_manager=None
     ):
         self.root = root
         self.config = config
@@ -36,6 +37,11 @@ class TranscriptionGUI:
         self.trace_id = trace_id
         self.on_model_change_callback = on_model_change_callback
         self.graceful_shutdown_callback = graceful_shutdown_callback
+        self.model_manager = model_manager
+        self.hotkey_listener = None
+        self.scheduler = None
+        # Called with each new settings snapshot; set by main
+        self.on_settings_change = None
 
         self.root.title("Push-to-Talk Transcription")
         self.root.geometry("800x600")
@@ -46,11 +52,24 @@ class TranscriptionGUI:
         self.is_recording = False
         self.timeout_timer = None
         self.plot_update_interval = 100  # ms
+        self.waveform_recording = False
+
+        # Transcription history: the widget shows at most history_max_entries
+        # entries and pages older ones in from the transcript logs on scroll
+        gui_settings = self.config.get('gui_settings', {})
+        self.history_max_entries = max(1, gui_settings.get('history_max_entries', 200))
+        self.history_page_size = max(1, gui_settings.get('history_page_size', 50))
+        self.history = TranscriptHistory(self.history_max_entries, correlation_id)
+        self._shown_entries = deque()
+        self._showing_latest = True
+        self._older_exhausted = False
 
         # Create GUI components
         self.create_menu()
         self.create_main_frame()
         self.setup_waveform_plot()
+        # Fill the history with the latest saved transcriptions
+        self.root.after_idle(self.load_older_transcriptions)
 
         # Start waveform updating
         self.update_waveform()
@@ -84,17 +103,19 @@ class TranscriptionGUI:
         self.status_label = ttk.Label(status_frame, text="Idle", font=("Helvetica", 12))
         self.status_label.grid(row=0, column=1, sticky='w', padx=(10, 0))
         create_tooltip(self.status_label, "Current status of the application.")
+        self.queue_label = ttk.Label(status_frame, text="", font=("Helvetica", 10))
+        self.queue_label.grid(row=0, column=2, sticky='e')
+        create_tooltip(self.queue_label, "Recordings waiting for or in transcription.")
 
         # Instructions Frame
         instructions_frame = ttk.Frame(self.main_frame)
         instructions_frame.grid(row=1, column=0, sticky='ew', pady=(0, 10))
         instructions_frame.columnconfigure(1, weight=1)
 
-        keys = ' + '.join([key.upper() for key in self.config.get('key_combination', ['ctrl', 'alt', 'space'])])
         ttk.Label(instructions_frame, text="Instructions:", font=("Helvetica", 10)).grid(row=0, column=0, sticky='w')
         self.instructions_label = ttk.Label(
             instructions_frame,
-            text=f"Press '{keys}' to toggle recording.",
+            text=self.instructions_text(),
             font=("Helvetica", 10)
         )
         self.instructions_label.grid(row=0, column=1, sticky='w', padx=(10, 0))
@@ -108,7 +129,12 @@ class TranscriptionGUI:
 
         self.transcription_text = scrolledtext.ScrolledText(transcription_frame, wrap='word', state='disabled')
         self.transcription_text.grid(row=0, column=0, sticky='nsew', padx=5, pady=5)
-        create_tooltip(self.transcription_text, "Transcribed text will appear here.")
+        self.transcription_text.configure(yscrollcommand=self.on_history_scroll)
+        self.transcription_text.tag_configure('low_confidence', foreground='#b35900', underline=True)
+        create_tooltip(
+            self.transcription_text,
+            "Transcribed text will appear here. Scroll up for earlier transcriptions. Underlined text is low confidence."
+        )
 
         # Waveform Visualization Frame
         waveform_frame = ttk.LabelFrame(self.main_frame, text="Live Audio Waveform")
@@ -136,21 +162,19 @@ class TranscriptionGUI:
         self.main_frame.rowconfigure(3, weight=1)
         self.main_frame.columnconfigure(0, weight=1)
 
+    def instructions_text(self):
+        """Describes the hotkey for the current key combination and mode."""
+        keys = ' + '.join([key.upper() for key in self.config.get('key_combination', ['ctrl', 'alt', 'space'])])
+        if self.config.get('hotkey_mode', 'toggle') == 'hold':
+            return f"Hold '{keys}' to record; release to transcribe."
+        return f"Press '{keys}' to toggle recording."
+
     def setup_waveform_plot(self):
-        """Sets up the waveform plot using matplotlib."""
-        self.fig, self.ax = plt.subplots(figsize=(8, 3))
-        self.ax.set_title("Audio Waveform")
-        self.ax.set_xlabel("Time (s)")
-        self.ax.set_ylabel("Amplitude")
-        self.line, = self.ax.plot([], [], lw=1)
-        self.ax.set_xlim(0, self.config.get('max_recording_duration', 60))
-        self.ax.set_ylim(-1, 1)
-        self.ax.grid(True)
-
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.main_frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().grid(row=3, column=0, sticky='nsew', padx=5, pady=5)
-        create_tooltip(self.canvas.get_tk_widget(), "Real-time audio waveform visualization.")
+        """Sets up the live waveform display."""
+        samplerate, channels = recording_format(self.config)
+        self.waveform = WaveformRenderer(self.main_frame, samplerate * channels)
+        self.waveform.canvas.grid(row=3, column=0, sticky='nsew', padx=5, pady=5)
+        create_tooltip(self.waveform.canvas, "Real-time audio waveform visualization.")
 
     def open_preferences(self):
         """Opens the preferences window."""
@@ -173,9 +197,6 @@ class TranscriptionGUI:
         # Reload the configuration
         try:
             new_config = load_config()
-            self.config.update(new_config)
-            logger.info("Preferences updated successfully.", extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id})
-            messagebox.showinfo("Preferences", "Preferences updated successfully.")
         except Exception as e:
             sanitized_error = sanitize_message(str(e))
             logger.error(
@@ -185,33 +206,56 @@ class TranscriptionGUI:
             )
             messagebox.showerror("Error", f"Failed to reload configuration: {e}")
             return
+        # Restarts only what the saved changes affect
+        if self.on_settings_change is not None:
+            self.on_settings_change(new_config)
+        logger.info("Preferences updated successfully.", extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id})
+        messagebox.showinfo("Preferences", "Preferences updated successfully.")
+
+    def apply_settings(self, new_config, changed):
+        """Updates the window, model, hotkey and log level for the settings in `changed`."""
+        self.config = new_config
 
         # Update GUI Settings
-        always_on_top = self.config.get('gui_settings', {}).get('always_on_top', True)
-        self.root.attributes("-topmost", always_on_top)
+        if 'gui_settings.always_on_top' in changed:
+            self.root.attributes("-topmost", new_config.get('gui_settings', {}).get('always_on_top', True))
 
         # Update Model Support if needed
-        default_model = self.config.get('model_support', {}).get('default_model', 'base')
+        default_model = new_config.model_name
         if default_model != self.current_model_name:
-            # Load the new model in a separate thread
             self.current_model_name = default_model
-            self.load_model_in_thread(default_model)
+            if self.model_manager.is_resident(default_model):
+                # Already in memory, no need to reload it
+                self.model = self.model_manager.get(default_model)
+                self.update_status(f"Model '{default_model}' loaded.")
+            else:
+                # Load the new model in a separate thread
+                self.load_model_in_thread(default_model)
+
+        # Apply the new key combination and mode to the running hotkey listener
+        if self.hotkey_listener is not None and changed & {'key_combination', 'hotkey_mode'}:
+            try:
+                self.hotkey_listener.set_keys(new_config.key_combination)
+                self.hotkey_listener.set_mode(new_config.hotkey_mode)
+            except ValueError as e:
+                sanitized_error = sanitize_message(str(e))
+                logger.error(
+                    f"Failed to update hotkey: {sanitized_error}",
+                    extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id}
+                )
+                messagebox.showerror("Error", f"Failed to update hotkey: {e}")
 
         # Update Instructions label with new key combination
-        keys = ' + '.join([key.upper() for key in self.config.get('key_combination', ['ctrl', 'alt', 'space'])])
-        self.instructions_label.config(text=f"Press '{keys}' to toggle recording.")
-
-        # Update waveform x-axis limit
-        self.ax.set_xlim(0, self.config.get('max_recording_duration', 60))
-        self.canvas.draw()
+        self.instructions_label.config(text=self.instructions_text())
 
-        # Restart audio stream with new device
-        self.restart_audio_stream()
+        # Update the waveform time scale
+        samples_per_second = new_config.recording_samplerate * new_config.recording_channels
+        if samples_per_second != self.waveform.samples_per_second:
+            self.waveform.samples_per_second = samples_per_second
+            self.waveform.reset()
 
-    def restart_audio_stream(self):
-        """Restarts the audio input stream with the new device."""
-        from main import restart_audio_stream  # Import function from main
-        restart_audio_stream(self, self.config)
+        if 'Logging.log_level' in changed:
+            self.set_log_level(new_config['Logging']['log_level'])
 
     def load_model_in_thread(self, model_name):
         """Loads the model in a separate thread."""
@@ -220,7 +264,7 @@ class TranscriptionGUI:
                 self.root.after(0, self.update_status, f"Loading model '{model_name}'...")
                 self.root.after(0, self.start_progress)
                 from main import load_model_with_retry  # Import function from main
-                model_loaded = load_model_with_retry(model_name)
+                model_loaded = load_model_with_retry(model_name, self.model_manager)
                 self.model = model_loaded
                 self.root.after(0, self.update_status, f"Model '{model_name}' loaded.")
                 self.root.after(0, self.stop_progress)
@@ -241,7 +285,7 @@ class TranscriptionGUI:
                         self.root.after(0, self.update_status, f"Loading fallback model '{fallback_model}'...")
                         self.root.after(0, self.start_progress)
                         from main import load_model_with_retry
-                        model_loaded = load_model_with_retry(fallback_model)
+                        model_loaded = load_model_with_retry(fallback_model, self.model_manager)
                         self.model = model_loaded
                         self.root.after(0, self.update_status, f"Model '{fallback_model}' loaded.")
                         self.root.after(0, self.stop_progress)
@@ -281,19 +325,109 @@ class TranscriptionGUI:
         self.status_label.config(text=f"Status: {status}")
         self.root.update_idletasks()
 
-    def append_transcription(self, text):
-        """Appends transcribed text to the display."""
+    def append_transcription(self, text, timestamp=None, segments=None):
+        """Appends transcribed text to the display, dropping the oldest entries beyond the history bound."""
+        entry = self.history.append(timestamp or datetime.now().isoformat(), text, segments)
+        if self._showing_latest:
+            self._insert_entries([entry], at_end=True)
+            self._trim_entries(from_top=True)
+        else:
+            # Scrolled back through older pages; new text brings the view back to the latest
+            self.show_latest_transcriptions()
+        self.transcription_text.yview(tk.END)  # Scroll to the end
+        self.update_status(f"Transcription length: {self.history.total_characters} characters")
+
+    def _entry_chunks(self, entry):
+        """Splits an entry into (text, tags) pieces, tagging its low-confidence segments."""
+        if not entry.segments or ''.join(segment['text'] for segment in entry.segments).strip() != entry.text:
+            return [(entry.text, ())]
+        confidence_config = self.config.get('confidence', {})
+        chunks = [
+            [segment['text'], ('low_confidence',) if is_low_confidence(segment, confidence_config) else ()]
+            for segment in entry.segments
+        ]
+        # The entry text is stripped; so are the ends of its segments
+        chunks[0][0] = chunks[0][0].lstrip()
+        chunks[-1][0] = chunks[-1][0].rstrip()
+        return chunks
+
+    def _insert_entries(self, entries, at_end):
+        # One insert call with alternating text and tag arguments
+        pieces = []
+        for entry in entries:
+            for text, tags in self._entry_chunks(entry):
+                pieces.extend((text, tags))
+            pieces.extend(('\n', ()))
         self.transcription_text.config(state='normal')
-        self.transcription_text.insert(tk.END, text + '\n')
+        if at_end:
+            self.transcription_text.insert(tk.END, *pieces)
+            self._shown_entries.extend(entries)
+        else:
+            self.transcription_text.insert('1.0', *pieces)
+            self._shown_entries.extendleft(reversed(entries))
+        self.transcription_text.config(state='disabled')
+
+    def _trim_entries(self, from_top):
+        """Removes entries from one end of the widget until it is within the history bound."""
+        excess = len(self._shown_entries) - self.history_max_entries
+        if excess <= 0:
+            return
+        remove = self._shown_entries.popleft if from_top else self._shown_entries.pop
+        # Whole lines, so the count does not depend on how Tk measures characters
+        lines = sum(remove().text.count('\n') + 1 for _ in range(excess))
+        self.transcription_text.config(state='normal')
+        if from_top:
+            self.transcription_text.delete('1.0', f'{lines + 1}.0')
+        else:
+            self.transcription_text.delete(f'end - {lines + 1} lines', 'end - 1 lines')
+            self._showing_latest = False
         self.transcription_text.config(state='disabled')
-        self.transcription_text.yview(tk.END)  # Scroll to the end
-        length = len(self.transcription_text.get("1.0", tk.END).strip())
-        self.update_status(f"Transcription length: {length} characters")
+
+    def on_history_scroll(self, first, last):
+        """Pages older transcriptions in at the top of the history and returns to the latest at the bottom."""
+        self.transcription_text.vbar.set(first, last)
+        first, last = float(first), float(last)
+        if first <= 0.0 and last < 1.0 and not self._older_exhausted:
+            self.root.after_idle(self.load_older_transcriptions)
+        elif last >= 1.0 and first > 0.0 and not self._showing_latest:
+            self.root.after_idle(self.show_latest_transcriptions)
+
+    def load_older_transcriptions(self):
+        """Inserts the page of transcriptions preceding the oldest one shown."""
+        before = self._shown_entries[0].timestamp if self._shown_entries else datetime.now().isoformat()
+        page = self.history.older(before, self.history_page_size, self.config.get('save_directory', 'transcriptions'))
+        if not page:
+            self._older_exhausted = True
+            return
+        # Keeps the line that was at the top in place while text is inserted above it
+        self.transcription_text.mark_set('history_top', '1.0')
+        self._insert_entries(page, at_end=False)
+        self._trim_entries(from_top=False)
+        self.transcription_text.yview('history_top')
+
+    def show_latest_transcriptions(self):
+        """Replaces the history view with the most recent transcriptions."""
+        self.transcription_text.config(state='normal')
+        self.transcription_text.delete('1.0', tk.END)
+        self.transcription_text.config(state='disabled')
+        self._shown_entries.clear()
+        self._insert_entries(list(self.history.entries), at_end=True)
+        self._showing_latest = True
+        self._older_exhausted = False
+        self.transcription_text.yview(tk.END)
 
     def notify_user(self, message):
         """Displays a pop-up notification to the user."""
         messagebox.showinfo("Notification", message)
 
+    def update_queue_depth(self, depth):
+        """Shows how many recordings are pending and runs the progress bar while any are."""
+        self.queue_label.config(text=f"Queue: {depth}" if depth else "")
+        if depth:
+            self.start_progress()
+        else:
+            self.stop_progress()
+
     def start_progress(self):
         """Starts the progress bar."""
         self.progress.grid()
@@ -330,21 +464,15 @@ class TranscriptionGUI:
             self.stop_timeout_timer()
 
     def update_waveform(self):
-        """Updates the waveform plot with the latest audio data."""
+        """Draws the audio captured since the last update."""
         if self.is_recording:
-            with lock:
-                if audio_buffer:
-                    current_buffer = np.concatenate(audio_buffer).flatten()
-                    # Prevent division by zero
-                    max_abs = np.max(np.abs(current_buffer))
-                    if max_abs != 0:
-                        current_buffer = current_buffer / max_abs
-                    samplerate = self.config.get('samplerate', 16000)
-                    times = np.linspace(0, len(current_buffer)/samplerate, num=len(current_buffer))
-                    self.line.set_data(times, current_buffer)
-                    self.ax.set_xlim(0, max(10, times[-1]))
-                    self.ax.set_ylim(-1, 1)
-                    self.canvas.draw()
+            if not self.waveform_recording:
+                self.waveform.reset()
+                self.waveform_recording = True
+            # Only a view of the buffer is read; the audio callback is never blocked
+            self.waveform.update(audio_buffer.view().reshape(-1))
+        else:
+            self.waveform_recording = False
 
         # Schedule the next update
         if not should_exit:
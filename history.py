@@ -0,0 +1,129 @@
+# history.py
+
+import json
+import logging
+import os
+import re
+from collections import deque
+from logger import sanitize_message
+from utils import get_absolute_path
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Daily transcript logs written by persistence.PersistenceWriter
+_LOG_NAME = re.compile(r'^transcripts_(\d{4}-\d{2}-\d{2})\.jsonl$')
+
+# Bytes read at a time when scanning a log backwards
+_READ_BLOCK = 64 * 1024
+
+class HistoryEntry:
+    """One transcription shown in the history, with its timed segments when known."""
+    __slots__ = ('timestamp', 'text', 'segments')
+
+    def __init__(self, timestamp, text, segments=None):
+        self.timestamp = timestamp
+        self.text = text
+        self.segments = segments or []
+
+def _read_backwards(path, end):
+    """Yields (line start offset, line) for the complete lines before byte `end`, last line first."""
+    with open(path, 'rb') as log_file:
+        position = end
+        remainder = b''
+        while position > 0:
+            size = min(_READ_BLOCK, position)
+            position -= size
+            log_file.seek(position)
+            lines = (log_file.read(size) + remainder).split(b'\n')
+            # The first piece may be the end of a line that starts in an earlier block
+            remainder = lines.pop(0)
+            line_end = position + len(remainder) + 1
+            offsets = []
+            for line in lines:
+                offsets.append(line_end)
+                line_end += len(line) + 1
+            for offset, line in zip(reversed(offsets), reversed(lines)):
+                if line.strip():
+                    yield offset, line
+        if remainder.strip():
+            yield 0, remainder
+
+class TranscriptHistory:
+    """
+    The most recent transcriptions, with older ones read back from the daily logs.
+
+    Only the last `max_entries` transcriptions are held in memory, together
+    with a running character count, so appending costs the same at any point
+    in a session. Older transcriptions are paged in from the transcript logs,
+    which only exist when save_transcription is enabled.
+    """
+    def __init__(self, max_entries, correlation_id=None):
+        self.entries = deque(maxlen=max(1, max_entries))
+        self.correlation_id = correlation_id
+        self.total_characters = 0
+        # Where the last page read from disk stopped: (oldest timestamp, log path, byte offset)
+        self._cursor = None
+
+    def append(self, timestamp, text, segments=None):
+        """Records a transcription; the oldest one in memory is dropped once the bound is reached."""
+        entry = HistoryEntry(timestamp, text, segments)
+        self.entries.append(entry)
+        self.total_characters += len(text)
+        return entry
+
+    def older(self, before, count, save_directory):
+        """Returns up to `count` entries older than the timestamp `before`, oldest first."""
+        page = [entry for entry in self.entries if entry.timestamp < before][-count:]
+        if len(page) < count:
+            # The logs also hold the entries still in memory; read only what precedes them
+            oldest = page[0].timestamp if page else before
+            page = self._from_logs(oldest, count - len(page), save_directory) + page
+        return page
+
+    def _from_logs(self, before, count, save_directory):
+        try:
+            directory = get_absolute_path(save_directory)
+            if self._cursor is not None and self._cursor[0] == before:
+                _, path, end = self._cursor
+            else:
+                path, end = None, None
+            page = []
+            for log_path in self._logs(directory, before, path):
+                log_end = end if log_path == path else os.path.getsize(log_path)
+                for offset, line in _read_backwards(log_path, log_end):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    timestamp = record.get('timestamp', '')
+                    if timestamp >= before:
+                        continue
+                    page.append(HistoryEntry(timestamp, record.get('text', ''), record.get('segments')))
+                    if len(page) == count:
+                        page.reverse()
+                        self._cursor = (page[0].timestamp, log_path, offset)
+                        return page
+            page.reverse()
+            self._cursor = None
+            return page
+        except OSError as e:
+            sanitized_error = sanitize_message(str(e))
+            logger.warning(f"Failed to read older transcriptions: {sanitized_error}", extra={'correlation_id': self.correlation_id})
+            return []
+
+    @staticmethod
+    def _logs(directory, before, start_path=None):
+        """Returns the log files that can hold entries older than `before`, newest first."""
+        if not os.path.isdir(directory):
+            return []
+        days = sorted(
+            (match.group(1), os.path.join(directory, name))
+            for name, match in ((name, _LOG_NAME.match(name)) for name in os.listdir(directory))
+            if match and match.group(1) <= before[:10]
+        )
+        paths = [path for _, path in reversed(days)]
+        if start_path in paths:
+            return paths[paths.index(start_path):]
+        return paths
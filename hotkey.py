@@ -0,0 +1,124 @@
+# hotkey.py
+
+import logging
+import threading
+import time
+import keyboard
+from logger import sanitize_message
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+HOTKEY_MODES = ('toggle', 'hold')
+
+class HotkeyListener:
+    """
+    Tracks a key chord from keyboard hook events instead of polling.
+
+    The hook reports every key-down and key-up, so the chord state changes as
+    soon as the OS delivers the event and nothing runs while keys are idle.
+    In 'toggle' mode each press of the chord calls `on_activate`; in 'hold'
+    mode pressing the chord calls `on_activate` and releasing any of its keys
+    calls `on_deactivate`. Both callbacks receive the OS event timestamp so the
+    caller can measure key-to-action latency.
+
+    Both edges are debounced: a change of the chord state within
+    `debounce_seconds` of the last reported one is key bounce and is only
+    reported if the state still differs once that time has passed (the
+    callback then receives None instead of a timestamp).
+    """
+    def __init__(self, keys, on_activate, on_deactivate, mode='toggle', debounce_seconds=0.05,
+                 correlation_id=None, trace_id=None):
+        self.on_activate = on_activate
+        self.on_deactivate = on_deactivate
+        self.debounce_seconds = debounce_seconds
+        self.correlation_id = correlation_id
+        self.trace_id = trace_id
+        self._lock = threading.Lock()
+        self._pressed = set()
+        self._active = False
+        # Chord state last passed to the callbacks, and when it changed
+        self._reported = False
+        self._last_transition = 0.0
+        self._settle_timer = None
+        self._hook = None
+        self.set_mode(mode)
+        self.set_keys(keys)
+
+    def set_keys(self, keys):
+        """Changes the chord. Each key matches all of its scan codes, e.g. left and right ctrl."""
+        chord = [frozenset(keyboard.key_to_scan_codes(key)) for key in keys]
+        with self._lock:
+            self.keys = list(keys)
+            self._chord = chord
+            self._pressed.clear()
+            self._active = False
+            self._reported = False
+
+    def set_mode(self, mode):
+        """Switches between 'toggle' and 'hold'."""
+        if mode not in HOTKEY_MODES:
+            raise ValueError(f"Unknown hotkey mode '{mode}'. Expected one of: {', '.join(HOTKEY_MODES)}")
+        self.mode = mode
+
+    def start(self):
+        """Installs the keyboard hook."""
+        if self._hook is None:
+            self._hook = keyboard.hook(self._on_event)
+            logger.info(
+                f"Hotkey listener started ({self.mode} mode). Waiting for {' + '.join(self.keys)}.",
+                extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id}
+            )
+
+    def stop(self):
+        """Removes the keyboard hook."""
+        if self._hook is not None:
+            keyboard.unhook(self._hook)
+            self._hook = None
+        with self._lock:
+            if self._settle_timer is not None:
+                self._settle_timer.cancel()
+                self._settle_timer = None
+
+    def _on_event(self, event):
+        with self._lock:
+            if event.event_type == keyboard.KEY_DOWN:
+                self._pressed.add(event.scan_code)
+            else:
+                self._pressed.discard(event.scan_code)
+            # Auto-repeat and unrelated keys leave the chord state as it was
+            self._active = all(codes & self._pressed for codes in self._chord)
+        self._report(event.time)
+
+    def _on_settled(self):
+        with self._lock:
+            self._settle_timer = None
+        self._report(None)
+
+    def _report(self, event_time):
+        try:
+            with self._lock:
+                if self._active == self._reported:
+                    return
+                now = time.monotonic()
+                remaining = self._last_transition + self.debounce_seconds - now
+                if remaining > 0:
+                    # Too soon after the last change to be a new press or release; look again once settled
+                    if self._settle_timer is None:
+                        self._settle_timer = threading.Timer(remaining, self._on_settled)
+                        self._settle_timer.daemon = True
+                        self._settle_timer.start()
+                    return
+                self._reported = active = self._active
+                self._last_transition = now
+            if active:
+                self.on_activate(event_time)
+            elif self.mode == 'hold':
+                self.on_deactivate(event_time)
+        except Exception as e:
+            sanitized_error = sanitize_message(str(e))
+            logger.error(
+                f"Error in hotkey listener: {sanitized_error}",
+                extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id},
+                exc_info=True
+            )
@@ -1,7 +1,10 @@
 # logger.py
 
+import atexit
 import logging
 import logging.handlers
+import queue
+from collections import deque
 from pythonjsonlogger import jsonlogger
 from utils import get_absolute_path
 import os
@@ -13,30 +16,203 @@ import re
 logger = logging.getLogger(__name__)
 
 class ContextFilter(logging.Filter):
-    """Injects contextual information into logs."""
+    """Injects contextual information into logs that do not carry their own."""
     def __init__(self, correlation_id, trace_id):
         super().__init__()
         self.correlation_id = correlation_id
         self.trace_id = trace_id
 
     def filter(self, record):
-        record.correlation_id = self.correlation_id
-        record.trace_id = self.trace_id
+        if getattr(record, 'correlation_id', None) is None:
+            record.correlation_id = self.correlation_id
+        if getattr(record, 'trace_id', None) is None:
+            record.trace_id = self.trace_id
         return True
 
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the log listener thread without ever blocking the caller.
+
+    Records are queued as they are; formatting and file I/O happen on the
+    listener thread. When the queue is full the record is dropped and counted.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record needs no flattening here
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogListener(logging.handlers.QueueListener):
+    """Formats and writes queued records on its own thread."""
+    def enqueue_sentinel(self):
+        # The queue is bounded and may be full at shutdown, so wait for room
+        self.queue.put(self._sentinel)
+
+class RealtimeLog:
+    """
+    Logging for real-time threads such as the audio callback.
+
+    A call only appends a tuple to a bounded deque, which takes no lock in
+    CPython and never blocks; the log maintenance thread turns the entries
+    into ordinary log records. Entries beyond `capacity` between two flushes
+    are counted and dropped.
+    """
+    def __init__(self, name, capacity=256):
+        self._logger = logging.getLogger(name)
+        self._entries = deque(maxlen=capacity)
+        self.dropped = 0
+        _realtime_logs.append(self)
+
+    def log(self, level, message, *args, extra=None):
+        if len(self._entries) == self._entries.maxlen:
+            self.dropped += 1
+            return
+        self._entries.append((level, message, args, extra))
+
+    def debug(self, message, *args, extra=None):
+        self.log(logging.DEBUG, message, *args, extra=extra)
+
+    def warning(self, message, *args, extra=None):
+        self.log(logging.WARNING, message, *args, extra=extra)
+
+    def flush(self):
+        """Emits the pending entries through the module logger."""
+        while self._entries:
+            level, message, args, extra = self._entries.popleft()
+            self._logger.log(level, message, *args, extra=extra)
+
 log_lock = threading.Lock()
 _logger_initialized = False
+_queue_handler = None
+_listener = None
+_realtime_logs = []
+_maintenance_stop = threading.Event()
+_maintenance_thread = None
+
+def _report_drops(reported):
+    """Logs how many records were dropped since the last report and returns the new totals."""
+    totals = {"the log queue": _queue_handler.dropped if _queue_handler is not None else 0}
+    for realtime_log in _realtime_logs:
+        totals[f"the real-time log of {realtime_log._logger.name}"] = realtime_log.dropped
+    for source, total in totals.items():
+        if total > reported.get(source, 0):
+            logger.warning(f"Dropped {total - reported.get(source, 0)} log records because {source} was full.")
+    return totals
+
+def _maintain_logs(interval):
+    reported = {}
+    while not _maintenance_stop.wait(interval):
+        for realtime_log in _realtime_logs:
+            realtime_log.flush()
+        reported = _report_drops(reported)
+    for realtime_log in _realtime_logs:
+        realtime_log.flush()
+    _report_drops(reported)
+
+def dropped_log_records():
+    """Returns the number of log records dropped because a log queue was full."""
+    handler_drops = _queue_handler.dropped if _queue_handler is not None else 0
+    return handler_drops + sum(realtime_log.dropped for realtime_log in _realtime_logs)
+
+# Built-in redaction patterns. Each is written so that every match attempt
+# fails after a bounded amount of work, which keeps a scan linear in the
+# message length even for long runs of digits or word characters.
+DEFAULT_REDACTION_PATTERNS = {
+    # Starts only at the beginning of a run of address characters
+    'email': r'(?<![\w.-])[\w.-]+@[\w.-]+',
+    # 13 to 16 digits, optionally separated by single spaces or dashes
+    'credit_card': r'\b\d(?:[ -]?\d){12,15}\b',
+}
+
+# Global inline flags, e.g. '(?i)', which are only allowed at the start of a pattern
+_GLOBAL_FLAGS = re.compile(r'\(\?([aiLmsux]+)\)')
+# Numbered group references inside a pattern: \N and the (?(N)...) conditional
+_GROUP_REFERENCE = re.compile(r'\\(?:[0-7]{3}|0[0-7]{0,2}|([1-9][0-9]?))|\[\^?\]?(?:\\.|[^\]\\])*\]|\(\?\(([0-9]+)\)|\\.')
+
+def _scope_flags(pattern):
+    """Turns leading global flags into a scoped group, which can sit inside an alternation."""
+    flags = ''
+    while True:
+        match = _GLOBAL_FLAGS.match(pattern)
+        if match is None:
+            break
+        flags += match.group(1)
+        pattern = pattern[match.end():]
+    return f'(?{flags}:{pattern})' if flags else pattern
+
+def _shift_group_references(pattern, offset):
+    """Renumbers \\N backreferences and (?(N)...) conditionals by `offset` groups."""
+    def shift(match):
+        if match.group(1):
+            number = int(match.group(1)) + offset
+            if number > 99:
+                raise ValueError("Backreferences past group 99 cannot be expressed; use named groups (?P<name>...).")
+            # Wrapped so following digits are not read as part of the number
+            return f'(?:\\{number})'
+        if match.group(2):
+            return f'(?({int(match.group(2)) + offset})'
+        # Octal escapes, character classes and other escapes stay as they are
+        return match.group(0)
+    return _GROUP_REFERENCE.sub(shift, pattern)
+
+class Redactor:
+    """
+    Replaces sensitive substrings in one pass over a message.
+
+    All patterns are compiled once into a single alternation; the
+    alternative that matched names the replacement, '[REDACTED <NAME>]'.
+    Leading inline flags such as '(?i)' are scoped to their own pattern and
+    numbered backreferences are renumbered for their place in the
+    alternation. Invalid patterns raise ValueError.
+    """
+    def __init__(self, patterns):
+        alternatives = []
+        self._names = {}
+        group = 1
+        for name, pattern in patterns.items():
+            try:
+                inner_groups = re.compile(pattern).groups
+            except re.error as e:
+                raise ValueError(f"Invalid redaction pattern '{name}': {e}") from e
+            # Inside the alternation, the pattern's own group N becomes group + N
+            alternatives.append(f'({_shift_group_references(_scope_flags(pattern), group)})')
+            # The outer group closes last, so it is the match's lastindex
+            self._names[group] = f'[REDACTED {name.upper()}]'
+            group += 1 + inner_groups
+        try:
+            self._regex = re.compile('|'.join(alternatives), flags=re.IGNORECASE) if alternatives else None
+        except re.error as e:
+            # e.g. two patterns defining the same group name
+            raise ValueError(f"Redaction patterns cannot be combined: {e}") from e
+
+    def _replacement(self, match):
+        return self._names[match.lastindex]
+
+    def redact(self, message):
+        if self._regex is None:
+            return message
+        return self._regex.sub(self._replacement, message)
+
+_redactor = Redactor(DEFAULT_REDACTION_PATTERNS)
+
+def configure_redaction(extra_patterns):
+    """Adds user-defined patterns (name -> regular expression) to the built-in ones."""
+    global _redactor
+    patterns = dict(DEFAULT_REDACTION_PATTERNS)
+    patterns.update(extra_patterns or {})
+    _redactor = Redactor(patterns)
 
 def sanitize_message(message):
     """Sanitizes sensitive information from log messages."""
-    patterns = {
-        'email': r'[\w\.-]+@[\w\.-]+',
-        'credit_card': r'\b(?:\d[ -]*?){13,16}\b',
-        # Add additional patterns as needed
-    }
-    for key, pattern in patterns.items():
-        message = re.sub(pattern, f'[REDACTED {key.upper()}]', message, flags=re.IGNORECASE)
-    return message
+    return _redactor.redact(message)
 
 def cleanup_old_logs(log_dir, config):
     """Cleans up old log files based on retention policies."""
@@ -82,7 +258,7 @@ def cleanup_old_logs(log_dir, config):
 
 def setup_logging(config, correlation_id, trace_id):
     """Sets up advanced structured logging with context and cleanup."""
-    global _logger_initialized
+    global _logger_initialized, _queue_handler, _listener, _maintenance_thread
     if _logger_initialized:
         return  # Logging is already configured
 
@@ -117,28 +293,57 @@ def setup_logging(config, correlation_id, trace_id):
             )
 
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers = [file_handler]
 
         # Console Handler
         if config.get('Logging', {}).get('log_to_console', False):
             console_handler = logging.StreamHandler()
             console_handler.setLevel(getattr(logging, config.get('Logging', {}).get('console_log_level', 'INFO').upper(), logging.INFO))
             console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
+            handlers.append(console_handler)
 
-        # Add Context Filter
-        context_filter = ContextFilter(correlation_id, trace_id)
-        logger.addFilter(context_filter)
+        # Callers only queue records; one listener thread formats and writes them
+        _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=config.get('Logging', {}).get('queue_size', 10000)))
+        # On the handler rather than the logger, so records from every module get the context
+        _queue_handler.addFilter(ContextFilter(correlation_id, trace_id))
+        logger.addHandler(_queue_handler)
+        _listener = LogListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _maintenance_stop.clear()
+        _maintenance_thread = threading.Thread(
+            target=_maintain_logs, args=(config.get('Logging', {}).get('flush_interval', 1.0),), name="log-maintenance", daemon=True
+        )
+        _maintenance_thread.start()
+        atexit.register(shutdown_logging)
+
+        try:
+            configure_redaction(config.get('Logging', {}).get('redact_patterns', {}))
+        except ValueError as e:
+            # Keep the built-in patterns rather than logging without redaction
+            logger.error(str(e))
 
         # Clean up old logs based on retention policy
         cleanup_old_logs(log_dir, config)
 
         _logger_initialized = True
 
+def shutdown_logging():
+    """Writes out every queued record and stops the logging threads."""
+    global _listener, _maintenance_thread
+    with log_lock:
+        if _maintenance_thread is not None:
+            _maintenance_stop.set()
+            _maintenance_thread.join()
+            _maintenance_thread = None
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
 def set_log_level(new_level):
     """Dynamically sets the log level."""
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, new_level.upper(), logging.DEBUG))
-    for handler in logger.handlers:
+    handlers = list(logger.handlers) + (list(_listener.handlers) if _listener is not None else [])
+    for handler in handlers:
         handler.setLevel(getattr(logging, new_level.upper(), logging.DEBUG))
     logger.info(f"Log level dynamically changed to {new_level.upper()}")
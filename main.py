@@ -1,15 +1,14 @@
 # main.py
 
 import tkinter as tk
+import importlib
 import threading
 import logging
-from config import load_config, save_config, ConfigError
-from logger import setup_logging, set_log_level
-from transcription import load_whisper_model
+from config import ConfigError, ConfigWatcher, changed_settings, load_config, save_config
+from logger import RealtimeLog, setup_logging, set_log_level
+from model_manager import ModelManager
 from gui import TranscriptionGUI
-from audio_handler import start_audio_stream, save_audio_clip, AudioProcessingError
-import keyboard
-import pyautogui
+from audio_handler import open_input_stream, start_audio_stream, AudioProcessingError
 import numpy as np
 import time
 import psutil
@@ -19,19 +18,66 @@ from datetime import datetime
 import os
 import sounddevice as sd
 from state import lock, should_exit, audio_buffer, correlation_id
-import noisereduce as nr
 from utils import get_absolute_path, create_tooltip
 import subprocess
-import torch
 import uuid
 from logger import sanitize_message
+from streaming import StreamingTranscriber
+from preprocessing import preprocess_audio
+from hotkey import HotkeyListener
+from metrics import metrics, start_exporters
+from noise_reduction import StreamingNoiseReducer
+from persistence import PersistenceWriter
+from text_injection import TextInjector
+from scheduler import Clip, TranscriptionScheduler
+from capture import StreamingResampler, capture_dtype, device_format, recording_format, to_float32
+from confidence import redecode, to_recording_time
+from transcription import TranscriptionResult
 
 # Set up module-specific logger
 logger = logging.getLogger(__name__)
 
+# Log for the audio callback: appending to it never locks, formats or writes
+audio_callback_log = RealtimeLog(__name__)
+
 # Generate a trace_id
 trace_id = str(uuid.uuid4())
 
+# Slow to import and not needed to show the window; imported once capture is running
+BACKGROUND_IMPORTS = ('noisereduce', 'pyautogui')
+
+# Settings that need the audio stream reopened, or only the noise reducer restarted
+STREAM_SETTINGS = {'audio_device_index', 'samplerate', 'channels', 'dtype', 'capture', 'max_recording_duration', 'preroll_seconds'}
+NOISE_SETTINGS = {'enable_noise_reduction', 'noise_reduction'}
+# Sections applied key by key on reload, and the keys in them that can change live
+LIVE_SECTIONS = {'model_support', 'Logging', 'gui_settings'}
+LIVE_SETTINGS = {'model_support.default_model', 'Logging.log_level', 'gui_settings.always_on_top'}
+# Read once by components built at startup
+RESTART_SETTINGS = {
+    'metrics', 'persistence', 'text_injection', 'transcription_queue', 'result_cache',
+    'startup', 'LogCleanup', 'config_reload', 'hotkey_debounce',
+}
+
+# Re-decode models being loaded in the background
+redecode_loading = set()
+redecode_lock = threading.Lock()
+
+# Used to report the time to first transcription
+startup_time = time.monotonic()
+first_transcription_reported = False
+
+# Streaming transcriber for the recording in progress, if streaming is enabled
+active_streamer = None
+
+# Denoises audio during capture when streaming noise reduction is enabled
+noise_reducer = None
+
+# A settings snapshot that changes the audio format, held back until the recording in progress stops
+pending_settings = None
+
+# Per-worker float32 arrays that integer recordings are converted into
+staging_arrays = threading.local()
+
 # Retry decorator to retry function on failure
 def retry_on_failure(retries=3, delay=1):
     def decorator(func):
@@ -53,9 +99,9 @@ def retry_on_failure(retries=3, delay=1):
     return decorator
 
 @retry_on_failure()
-def load_model_with_retry(model_name):
+def load_model_with_retry(model_name, model_manager):
     """Attempts to load the model with retries."""
-    return load_whisper_model(model_name, correlation_id)
+    return model_manager.get(model_name)
 
 # Error handling
 def handle_unexpected_error(type, value, traceback_obj):
@@ -126,18 +172,22 @@ def check_dependencies():
         tk.messagebox.showerror("Dependency Error", f"Audio input device not available: {e}")
         graceful_shutdown()
 
-def audio_callback(indata, frames, time_info, status, gui):
-    """Callback function to capture audio data."""
+def audio_callback(indata, frames, time_info, status, gui, resampler):
+    """Callback function to capture audio data; `resampler` converts the device's native format, if needed."""
     try:
+        if status:
+            metrics.counter('audio_callback_status_total', "Audio callbacks that reported a non-empty status.").inc()
+            if status.input_overflow:
+                metrics.counter('audio_input_overflows_total', "Audio blocks lost because the callback fell behind.").inc()
+        if resampler is not None:
+            # Downmixed and resampled block by block, so nothing is left to convert at stop
+            indata = resampler.process(indata)
+        # Single producer: the buffer is written without taking the lock. While
+        # idle it keeps only the pre-roll that will seed the next recording.
+        audio_buffer.write(indata)
         if gui.is_recording:
-            with lock:
-                audio_buffer.append(indata.copy())
-            # Avoid logging here unless necessary
-            # If needed, use logger.debug
-            logger.debug(
-                f"Captured {len(indata)} frames of audio.",
-                extra={'correlation_id': correlation_id, 'trace_id': trace_id}
-            )
+            # Formatted and written later on the log maintenance thread
+            audio_callback_log.debug("Captured %d frames of audio.", len(indata))
     except Exception as e:
         sanitized_error = sanitize_message(str(e))
         logger.error(
@@ -148,24 +198,63 @@ def audio_callback(indata, frames, time_info, status, gui):
         gui.update_status("Error")
         tk.messagebox.showerror("Error", f"Error during audio capture: {e}")
 
-def start_recording(gui, config):
+def start_recording(gui, config, key_down_time=None):
     """Starts recording audio."""
     if not config.get('record_audio', True):
         logger.info("Audio recording is disabled via configuration.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
         return
-    play_start_sound()
     with lock:
         if not gui.is_recording:
             gui.is_recording = True
-            audio_buffer.clear()
+            # The recording begins with the pre-roll already in the buffer
+            audio_buffer.arm()
+            denoise_job = noise_reducer.start_recording() if noise_reducer is not None else None
+            start_streaming(gui, config, denoise_job)
             gui.update_status("Recording")
-            logger.info("Recording started.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
+            if key_down_time is not None:
+                metrics.histogram('hotkey_to_record_seconds', "Delay from key-down to recording start.").observe(time.time() - key_down_time)
+                logger.info(
+                    f"Recording started {(time.time() - key_down_time) * 1000:.1f} ms after key-down.",
+                    extra={'correlation_id': correlation_id, 'trace_id': trace_id}
+                )
+            else:
+                logger.info("Recording started.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
             gui.start_timeout_timer()
+    # Beep after arming so the blocking sound does not delay the recording
+    play_start_sound()
+
+def start_streaming(gui, config, denoise_job=None):
+    """
+    Starts transcribing completed windows while the recording is still running.
+
+    With a `denoise_job`, windows are cut from the audio the streaming noise
+    reducer has already cleaned, so they are not denoised a second time.
+    """
+    global active_streamer
+    active_streamer = None
+    streaming_config = config.get('streaming_transcription', {})
+    if not streaming_config.get('enabled', False) or gui.model is None:
+        return
+    if denoise_job is not None:
+        audio_source = denoise_job.denoised
+    else:
+        audio_source = lambda: audio_buffer.view().reshape(-1)
+    denoised = denoise_job is not None
+    active_streamer = StreamingTranscriber(
+        audio_source,
+        lambda window: run_model(gui, preprocess_audio(window, config, denoised=denoised)[0]),
+        config.recording_samplerate * config.recording_channels,
+        streaming_config,
+        correlation_id,
+        trace_id
+    )
+    active_streamer.start()
 
 def stop_recording(gui):
     """Stops recording and initiates transcription."""
     if not gui.is_recording:
         return
+    stop_time = time.perf_counter()
     play_stop_sound()
     with lock:
         if gui.is_recording:
@@ -174,80 +263,246 @@ def stop_recording(gui):
             gui.stop_timeout_timer()
             logger.info("Recording stopped. Starting transcription.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
             if audio_buffer:
-                audio_data = np.concatenate(audio_buffer, axis=0).flatten()
-                transcription_thread = threading.Thread(target=transcribe_audio, args=(audio_data, gui), daemon=True)
-                transcription_thread.start()
+                if audio_buffer.dropped_frames:
+                    logger.warning(
+                        f"Audio buffer full; dropped {audio_buffer.dropped_frames} frames.",
+                        extra={'correlation_id': correlation_id, 'trace_id': trace_id}
+                    )
+                # take() hands over the recorded storage as a view, no copy
+                audio_data = audio_buffer.take()
+                denoise_job = noise_reducer.detach() if noise_reducer is not None else None
+                # Workers transcribe one job at a time and deliver results in order
+                gui.scheduler.submit(Clip(audio_data, stop_time, active_streamer, denoise_job))
             else:
                 logger.warning("No audio data captured.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
                 gui.update_status("Idle")
-            audio_buffer.clear()
+                audio_buffer.clear()
+                if noise_reducer is not None:
+                    noise_reducer.detach()
+                if active_streamer is not None:
+                    active_streamer.cancel()
+    if pending_settings is not None:
+        gui.root.after_idle(lambda: apply_settings(gui, pending_settings))
 
-def transcribe_audio(audio_data, gui):
-    """Transcribes the audio data and updates the GUI."""
-    try:
-        # Schedule GUI updates in the main thread
-        gui.root.after(0, gui.start_progress)
-        if audio_data.dtype != np.float32:
-            audio_data = audio_data.astype(np.float32)
-        # Apply noise reduction
-        noise_reduction_enabled = config.get('enable_noise_reduction', True)
-        if noise_reduction_enabled:
-            logger.info("Applying noise reduction...", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
-            # Estimate noise from the first 0.5 seconds
-            noise_sample = audio_data[:int(0.5 * config.get('samplerate', 16000))]
-            audio_data = nr.reduce_noise(y=audio_data, sr=config.get('samplerate', 16000), y_noise=noise_sample)
-        # Move audio data to the same device as the model
-        model_device = gui.model.device
-        audio_tensor = torch.from_numpy(audio_data).to(model_device)
-        # Perform transcription
-        result = gui.model.transcribe(audio_tensor, fp16=config.get('use_fp16', False))
-        transcription = result['text'].strip()
-        logger.info(f"Transcription: {transcription}", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
-        if transcription:
-            gui.root.after(0, lambda: gui.append_transcription(transcription))
-            if config.get('save_transcription', False):
-                save_transcription(transcription, config)
-            pyautogui.write(transcription + ' ')
-        if config.get('save_audio', False):
-            save_audio_clip(audio_data, config.get('save_directory', 'transcriptions'), config.get('samplerate', 16000), correlation_id)
-        if config.get('enable_system_monitoring', True):
-            log_system_usage()
-        gui.root.after(0, lambda: gui.update_status("Idle"))
-    except Exception as e:
-        sanitized_error = sanitize_message(str(e))
+def run_model(gui, audio_data):
+    """Runs the loaded model on preprocessed audio and returns the text."""
+    return decode(gui, audio_data).text.strip()
+
+def decode(gui, audio_data):
+    """
+    Transcribes preprocessed audio and returns the TranscriptionResult.
+
+    With confidence.redecode_model set, segments the loaded model was unsure
+    of are decoded again with that larger model, if it is resident.
+    """
+    if len(audio_data) == 0:
+        # Nothing but silence was captured
+        return TranscriptionResult('')
+    # Perform transcription with the configured backend
+    result = gui.model.transcribe(audio_data)
+    confidence_config = config.get('confidence', {})
+    redecode_model = confidence_config.get('redecode_model')
+    if redecode_model and redecode_model != gui.model.model_name:
+        backend = resident_redecode_backend(gui, redecode_model)
+        if backend is not None:
+            with metrics.span('redecode', "Time to re-decode low-confidence segments with the larger model."):
+                result, replaced = redecode(result, audio_data, config.recording_samplerate, backend, confidence_config)
+            metrics.counter('redecoded_spans_total', "Low-confidence spans replaced by the larger model.").inc(replaced)
+    return result
+
+def resident_redecode_backend(gui, model_name):
+    """Returns the re-decode model when it is resident; otherwise starts loading it once and returns None."""
+    backend = gui.model_manager.resident(model_name)
+    if backend is not None:
+        return backend
+    with redecode_lock:
+        if model_name in redecode_loading:
+            return None
+        redecode_loading.add(model_name)
+    if gui.model_manager.max_resident < 2:
+        # Loading it would evict the model doing the first pass
+        logger.warning(
+            f"Re-decoding with '{model_name}' needs model_support.resident_models of at least 2.",
+            extra={'correlation_id': correlation_id, 'trace_id': trace_id}
+        )
+        return None
+
+    def load():
+        try:
+            load_model_with_retry(model_name, gui.model_manager)
+        except Exception as e:
+            sanitized_error = sanitize_message(str(e))
+            logger.error(
+                f"Failed to load re-decode model '{model_name}': {sanitized_error}",
+                extra={'correlation_id': correlation_id, 'trace_id': trace_id}
+            )
+        finally:
+            with redecode_lock:
+                redecode_loading.discard(model_name)
+    # Recordings are transcribed without re-decoding until it is loaded
+    threading.Thread(target=load, name="redecode-model-loader", daemon=True).start()
+    return None
+
+def finish_clip(clip, timings):
+    """Completes the capture-time work on one recording and returns its audio."""
+    audio_data = clip.audio
+    if clip.denoise_job is not None:
+        # Most of the recording was denoised during capture; only the tail is left
+        start = time.perf_counter()
+        audio_data = clip.denoise_job.finish(audio_data)
+        timings['noise_reduction'] = timings.get('noise_reduction', 0.0) + time.perf_counter() - start
+        if noise_reducer is not None:
+            noise_reducer.save_profile()
+    return audio_data
+
+def staging_array(length):
+    """Returns this worker's preallocated float32 conversion array, sized for a full recording."""
+    staging = getattr(staging_arrays, 'array', None)
+    if staging is None or len(staging) < length:
+        staging = np.empty(max(length, audio_buffer.capacity_frames * audio_buffer.channels), dtype=np.float32)
+        staging_arrays.array = staging
+    return staging
+
+def transcribe_audio(clips, gui):
+    """
+    Transcribes a scheduler job and returns the details needed to deliver it.
+
+    A job holds one recording, or several when the scheduler merged them
+    under load; merged recordings are transcribed as a single clip.
+    """
+    timings = {}
+    samples_per_second = config.recording_samplerate * config.recording_channels
+    recorded_seconds = sum(len(clip.audio) for clip in clips) / samples_per_second
+    streamer = clips[0].streamer if len(clips) == 1 else None
+    audio_parts = [finish_clip(clip, timings) for clip in clips]
+    if streamer is not None:
+        audio_data = audio_parts[0]
+    else:
+        for clip in clips:
+            if clip.streamer is not None:
+                clip.streamer.cancel()
+        # A short gap keeps words at the joins apart
+        gap = np.zeros(int(0.3 * samples_per_second), dtype=np.float32)
+        audio_data = audio_parts[0] if len(audio_parts) == 1 else np.concatenate(
+            [part for audio in audio_parts for part in (to_float32(audio), gap)][:-1]
+        )
+        staging = staging_array(len(audio_data))
+        audio_data, kept = preprocess_audio(
+            audio_data, config, timings, denoised=clips[0].denoise_job is not None, staging=staging
+        )
+        if config.get('save_audio', False) and np.shares_memory(audio_data, staging):
+            # The clip outlives this job in the save queue; the staging array is reused
+            audio_data = audio_data.copy()
+    for stage, seconds in timings.items():
+        metrics.histogram(f"{stage}_seconds", f"Time spent in the {stage.replace('_', ' ')} stage.").observe(seconds)
+    inference_start = time.perf_counter()
+    segments = []
+    language = None
+    with metrics.span('inference', "Model inference time per recording."):
+        if streamer is not None:
+            # Earlier windows were decoded during recording; only the tail is
+            # left. Windows only keep their text, so there are no segments.
+            transcription = streamer.finish(audio_data)
+        else:
+            result = decode(gui, audio_data)
+            transcription = result.text.strip()
+            # Times refer to the recording, not to the audio left after silence trimming
+            segments = to_recording_time(result.segments, kept, config.recording_samplerate)
+            language = result.language
+    return {
+        'text': transcription,
+        'segments': segments,
+        'language': language,
+        'audio': audio_data,
+        'model': gui.model.model_name,
+        'recorded_seconds': recorded_seconds,
+        'inference_seconds': time.perf_counter() - inference_start,
+    }
+
+def deliver_transcription(job, gui):
+    """Shows, types and saves a finished job. The scheduler calls this in recording order."""
+    if job.error is not None:
+        sanitized_error = sanitize_message(str(job.error))
         logger.error(
             f"Error during transcription: {sanitized_error}",
             extra={'correlation_id': correlation_id, 'trace_id': trace_id},
-            exc_info=True
+            exc_info=job.error
         )
         gui.root.after(0, lambda: gui.update_status("Error"))
-        tk.messagebox.showerror("Error", f"Transcription failed: {e}")
-    finally:
-        gui.root.after(0, gui.stop_progress)
+        tk.messagebox.showerror("Error", f"Transcription failed: {job.error}")
+        return
+    result = job.result
+    transcription = result['text']
+    stop_time = job.clips[-1].stop_time
+    stop_to_text_seconds = None
+    if stop_time is not None:
+        stop_to_text_seconds = time.perf_counter() - stop_time
+        metrics.histogram('stop_to_text_seconds', "Delay from recording stop to transcribed text.").observe(stop_to_text_seconds)
+    logger.info(f"Transcription: {transcription}", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
+    report_time_to_first_transcription()
+    # Shared by the history view and the saved record so older entries can be paged back in
+    timestamp = datetime.now().isoformat()
+    if transcription:
+        gui.root.after(0, lambda: gui.append_transcription(transcription, timestamp, result['segments']))
+        # Typed on the injector's own thread so the next recording is not held up
+        text_injector.inject(transcription + ' ')
+    # Both saves only queue the work for the background writer
+    save_directory = config.get('save_directory', 'transcriptions')
+    audio_file = None
+    if config.get('save_audio', False):
+        audio_file = persistence_writer.audio_filename(datetime.now())
+        persistence_writer.save_audio(result['audio'], save_directory, audio_file, config.recording_samplerate)
+    if transcription and config.get('save_transcription', False):
+        persistence_writer.save_transcription({
+            'timestamp': timestamp,
+            'text': transcription,
+            'model': result['model'],
+            'recorded_seconds': round(result['recorded_seconds'], 3),
+            'inference_seconds': round(result['inference_seconds'], 3),
+            'stop_to_text_seconds': round(stop_to_text_seconds, 3) if stop_to_text_seconds is not None else None,
+            'audio_file': audio_file,
+            'language': result['language'],
+            'segments': result['segments'],
+        }, save_directory)
+    if config.get('enable_system_monitoring', True):
+        log_system_usage()
+    if not gui.is_recording:
+        gui.root.after(0, lambda: gui.update_status("Idle"))
 
-def save_transcription(transcription, config):
-    """Saves the transcription to a file with rollback on failure."""
-    try:
-        timestamp = datetime.now().strftime("%m-%d-%Y_%H-%M-%S")
-        transcription_dir = config.get('save_directory', 'transcriptions')
-        os.makedirs(transcription_dir, exist_ok=True)
-        transcription_file = os.path.join(transcription_dir, f"transcription_{timestamp}.txt")
-        temp_transcription_file = transcription_file + ".tmp"
-        with open(temp_transcription_file, 'w', encoding='utf-8') as f:
-            f.write(transcription)
-        os.replace(temp_transcription_file, transcription_file)
-        logger.info(f"Transcription saved to {transcription_file}", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
-    except Exception as e:
-        sanitized_error = sanitize_message(str(e))
-        logger.error(
-            f"Failed to save transcription: {sanitized_error}",
-            extra={'correlation_id': correlation_id, 'trace_id': trace_id},
-            exc_info=True
-        )
-        # Remove temporary file if it exists
-        if os.path.exists(temp_transcription_file):
-            os.remove(temp_transcription_file)
-        tk.messagebox.showerror("Error", f"Failed to save transcription: {e}")
+def on_queue_depth_change(gui, depth):
+    """Reflects the number of pending transcriptions in the metrics and the status bar."""
+    metrics.gauge('transcription_queue_depth', "Recordings waiting for or in transcription.").set(depth)
+    gui.root.after(0, lambda: gui.update_queue_depth(depth))
+
+def report_time_to_window():
+    """Logs how long after the process started the main window was first drawn."""
+    seconds = time.time() - psutil.Process(os.getpid()).create_time()
+    metrics.gauge('time_to_window_seconds', "Time from process start to the first drawn window.").set(seconds)
+    logger.info(f"Window shown {seconds:.2f}s after launch.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
+
+def import_in_background(module_names):
+    """Imports modules on a background thread so their first use does not wait for them."""
+    def run():
+        for module_name in module_names:
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                # The module is imported again, and the error raised, where it is used
+                sanitized_error = sanitize_message(str(e))
+                logger.warning(f"Background import of {module_name} failed: {sanitized_error}", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
+    threading.Thread(target=run, name="background-imports", daemon=True).start()
+
+def report_time_to_first_transcription():
+    """Logs how long after startup the first transcription finished, once per session."""
+    global first_transcription_reported
+    if first_transcription_reported:
+        return
+    first_transcription_reported = True
+    metrics.gauge('time_to_first_transcription_seconds', "Time from startup to the first finished transcription.").set(time.monotonic() - startup_time)
+    logger.info(
+        f"Time to first transcription: {time.monotonic() - startup_time:.2f}s after startup.",
+        extra={'correlation_id': correlation_id, 'trace_id': trace_id}
+    )
 
 def play_start_sound():
     """Plays a beep sound when recording starts."""
@@ -267,38 +522,45 @@ def log_system_usage():
     """Logs system resource usage."""
     process = psutil.Process(os.getpid())
     memory_info = process.memory_info()
-    cpu_usage = process.cpu_percent(interval=1)
+    # interval=None measures since the previous call instead of blocking for a second
+    cpu_usage = process.cpu_percent(interval=None)
     logger.info(
         f"Memory usage: {memory_info.rss / (1024 * 1024):.2f} MB, CPU usage: {cpu_usage:.2f}%",
         extra={'correlation_id': correlation_id, 'trace_id': trace_id}
     )
 
-def key_listener(gui, config):
-    """Listens for the key combination to toggle recording."""
-    keys = config.get('key_combination', ['ctrl', 'alt', 'space'])
-    logger.info(
-        f"Key listener started. Waiting for {' + '.join(keys)} to toggle recording.",
-        extra={'correlation_id': correlation_id, 'trace_id': trace_id}
-    )
-    while not should_exit:
-        try:
-            if all(keyboard.is_pressed(key) for key in keys):
-                if not gui.is_recording:
-                    gui.root.after(0, lambda: start_recording(gui, config))
-                else:
-                    gui.root.after(0, lambda: stop_recording(gui))
-                while all(keyboard.is_pressed(key) for key in keys):
-                    time.sleep(config.get('key_listener_sleep', 0.1))
-            time.sleep(config.get('key_listener_sleep', 0.1))
-        except Exception as e:
-            sanitized_error = sanitize_message(str(e))
-            logger.error(
-                f"Error in key listener: {sanitized_error}",
-                extra={'correlation_id': correlation_id, 'trace_id': trace_id},
-                exc_info=True
-            )
-            gui.update_status("Error")
-            tk.messagebox.showerror("Error", f"Key listener failed: {e}")
+def start_hotkey_listener(gui, config):
+    """Installs the event-driven hotkey listener that starts and stops recording."""
+    # The current snapshot is read on every key press so reloaded settings apply
+    def on_activate(key_down_time):
+        if gui.config.hotkey_mode == 'hold' or not gui.is_recording:
+            gui.root.after(0, lambda: start_recording(gui, gui.config, key_down_time))
+        else:
+            gui.root.after(0, lambda: stop_recording(gui))
+
+    def on_deactivate(key_up_time):
+        gui.root.after(0, lambda: stop_recording(gui))
+
+    try:
+        gui.hotkey_listener = HotkeyListener(
+            config.get('key_combination', ['ctrl', 'alt', 'space']),
+            on_activate,
+            on_deactivate,
+            mode=config.get('hotkey_mode', 'toggle'),
+            debounce_seconds=config.get('hotkey_debounce', 0.05),
+            correlation_id=correlation_id,
+            trace_id=trace_id
+        )
+        gui.hotkey_listener.start()
+    except Exception as e:
+        sanitized_error = sanitize_message(str(e))
+        logger.error(
+            f"Error in key listener: {sanitized_error}",
+            extra={'correlation_id': correlation_id, 'trace_id': trace_id},
+            exc_info=True
+        )
+        gui.update_status("Error")
+        tk.messagebox.showerror("Error", f"Key listener failed: {e}")
 
 def graceful_shutdown():
     """Handles clean shutdown on exit."""
@@ -307,6 +569,23 @@ def graceful_shutdown():
     if 'stream' in globals():
         stream.stop()
         stream.close()
+    if 'gui' in globals():
+        if gui.hotkey_listener is not None:
+            gui.hotkey_listener.stop()
+        if gui.scheduler is not None:
+            # Queued and in-flight recordings are transcribed and delivered before the models are closed
+            gui.scheduler.close(config.get('transcription_queue', {}).get('shutdown_timeout', 30))
+        # Releases resident models and stops transcription worker processes, if any
+        gui.model_manager.close_all()
+    if noise_reducer is not None:
+        noise_reducer.close()
+    if 'text_injector' in globals():
+        text_injector.close()
+    if 'config_watcher' in globals():
+        config_watcher.stop()
+    if 'persistence_writer' in globals():
+        # Writes out transcripts and clips that are still queued
+        persistence_writer.close()
     logger.info("Application has exited gracefully.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
     sys.exit(0)
 
@@ -316,7 +595,7 @@ def load_model_in_thread(model_name, gui):
         try:
             gui.root.after(0, lambda: gui.update_status(f"Loading model '{model_name}'..."))
             gui.root.after(0, gui.start_progress)
-            model_loaded = load_model_with_retry(model_name)
+            model_loaded = load_model_with_retry(model_name, gui.model_manager)
             gui.model = model_loaded
             gui.root.after(0, lambda: gui.update_status(f"Model '{model_name}' loaded."))
             gui.root.after(0, gui.stop_progress)
@@ -336,7 +615,7 @@ def load_model_in_thread(model_name, gui):
                 try:
                     gui.root.after(0, lambda: gui.update_status(f"Loading fallback model '{fallback_model}'..."))
                     gui.root.after(0, gui.start_progress)
-                    model_loaded = load_model_with_retry(fallback_model)
+                    model_loaded = load_model_with_retry(fallback_model, gui.model_manager)
                     gui.model = model_loaded
                     gui.root.after(0, lambda: gui.update_status(f"Model '{fallback_model}' loaded."))
                     gui.root.after(0, gui.stop_progress)
@@ -353,31 +632,141 @@ def load_model_in_thread(model_name, gui):
             graceful_shutdown()
     threading.Thread(target=load_model, daemon=True).start()
 
-def restart_audio_stream(gui, config):
-    """Restarts the audio input stream with the new device."""
-    global stream
-    if 'stream' in globals():
-        stream.stop()
-        stream.close()
+def start_noise_reducer(config, device_index):
+    """Starts streaming noise reduction for the input device, replacing any previous one."""
+    global noise_reducer
+    if noise_reducer is not None:
+        noise_reducer.close()
+        noise_reducer = None
+    noise_config = config.get('noise_reduction', {})
+    if not config.get('enable_noise_reduction', True) or noise_config.get('mode', 'streaming') != 'streaming':
+        return
     try:
-        device_index = config.get('audio_device_index', sd.default.device[0])
-        stream = start_audio_stream(
-            callback=lambda indata, frames, time_info, status: audio_callback(indata, frames, time_info, status, gui),
-            samplerate=config.get('samplerate', 16000),
-            channels=config.get('channels', 1),
-            dtype=config.get('dtype', 'float32'),
-            device=device_index
+        device_name = sd.query_devices(device_index)['name']
+    except Exception:
+        device_name = None
+    noise_reducer = StreamingNoiseReducer(
+        audio_buffer,
+        recording_format(config)[0],
+        noise_config,
+        device_name
+    )
+
+def allocate_audio_buffer(config):
+    """Preallocates the recording buffer for the longest allowed recording."""
+    audio_buffer.allocate(
+        *recording_format(config),
+        config.get('max_recording_duration', 60),
+        dtype=capture_dtype(config),
+        preroll_seconds=config.get('preroll_seconds', 0.5)
+    )
+
+def open_audio_stream(gui, config, device_index, start=True):
+    """Opens the input device, in its native format when capture.resample is enabled."""
+    device_samplerate, device_channels = device_format(sd.query_devices(device_index, 'input'), config)
+    samplerate, channels = recording_format(config)
+    if config.get('capture', {}).get('resample', True):
+        resampler = StreamingResampler(device_samplerate, samplerate, capture_dtype(config))
+        logger.info(
+            f"Capturing at {device_samplerate} Hz x {device_channels} channels, converted to {samplerate} Hz mono.",
+            extra={'correlation_id': correlation_id, 'trace_id': trace_id}
         )
-        logger.info("Audio stream restarted with new device.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
-    except AudioProcessingError as e:
-        sanitized_error = sanitize_message(str(e))
-        logger.error(
-            f"Failed to restart audio input stream: {sanitized_error}",
-            extra={'correlation_id': correlation_id, 'trace_id': trace_id},
-            exc_info=True
+    else:
+        resampler = None
+    # Each stream converts with its own resampler, so a replacement can be opened before the old one closes
+    open_stream = start_audio_stream if start else open_input_stream
+    return open_stream(
+        callback=lambda indata, frames, time_info, status: audio_callback(indata, frames, time_info, status, gui, resampler),
+        samplerate=device_samplerate,
+        channels=device_channels,
+        dtype=capture_dtype(config).name,
+        device=device_index
+    )
+
+def apply_settings(gui, new_config):
+    """Swaps in a new settings snapshot and re-applies only what changed. Runs on the Tk thread."""
+    global config, pending_settings
+    changed = changed_settings(config, new_config)
+    if changed & (STREAM_SETTINGS | NOISE_SETTINGS) and gui.is_recording:
+        # The recording in progress keeps the format it started with; stop_recording applies this
+        if pending_settings is None:
+            logger.info(
+                "Audio settings changed during a recording; they are applied when it stops.",
+                extra={'correlation_id': correlation_id, 'trace_id': trace_id}
+            )
+        pending_settings = new_config
+        return
+    pending_settings = None
+    if not changed:
+        config = new_config
+        return
+    logger.info(f"Settings changed: {', '.join(sorted(changed))}", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
+    if changed & STREAM_SETTINGS:
+        if not restart_audio_stream(gui, config, new_config):
+            # Everything stays on the previous snapshot until the file is fixed
+            return
+    elif changed & NOISE_SETTINGS:
+        start_noise_reducer(new_config, new_config.get('audio_device_index', sd.default.device[0]))
+    config = new_config
+    # Window, hotkey, model and log level
+    gui.apply_settings(new_config, changed)
+    pending = sorted(
+        key for key in changed
+        if key in RESTART_SETTINGS or ('.' in key and key.split('.')[0] in LIVE_SECTIONS and key not in LIVE_SETTINGS)
+    )
+    if pending:
+        logger.warning(
+            f"These settings take effect after a restart: {', '.join(pending)}",
+            extra={'correlation_id': correlation_id, 'trace_id': trace_id}
         )
-        tk.messagebox.showerror("Error", f"Failed to restart audio input stream: {e}")
-        graceful_shutdown()
+
+def restart_audio_stream(gui, old_config, new_config):
+    """
+    Switches capture to the device and format in `new_config`. Only called while not recording.
+
+    The new device is opened before the old stream is closed, so a device
+    that cannot be opened leaves capture running as it was. Returns whether
+    the switch succeeded.
+    """
+    global stream
+    old_device_index = old_config.get('audio_device_index', sd.default.device[0])
+    device_index = new_config.get('audio_device_index', sd.default.device[0])
+    try:
+        new_stream = open_audio_stream(gui, new_config, device_index, start=False)
+    except (AudioProcessingError, sd.PortAudioError, ValueError) as e:
+        report_audio_switch_error(e)
+        return False
+    old_stream = globals().get('stream')
+    if old_stream is not None:
+        old_stream.stop()
+    # Sample rate, channels or duration may have changed
+    allocate_audio_buffer(new_config)
+    # Noise profiles are kept per input device
+    start_noise_reducer(new_config, device_index)
+    try:
+        new_stream.start()
+    except sd.PortAudioError as e:
+        new_stream.close()
+        allocate_audio_buffer(old_config)
+        start_noise_reducer(old_config, old_device_index)
+        if old_stream is not None:
+            old_stream.start()
+        report_audio_switch_error(e)
+        return False
+    if old_stream is not None:
+        old_stream.close()
+    stream = new_stream
+    logger.info("Audio stream restarted with new device.", extra={'correlation_id': correlation_id, 'trace_id': trace_id})
+    return True
+
+def report_audio_switch_error(error):
+    sanitized_error = sanitize_message(str(error))
+    logger.error(
+        f"Failed to switch the audio input; keeping the previous settings: {sanitized_error}",
+        extra={'correlation_id': correlation_id, 'trace_id': trace_id},
+        exc_info=True
+    )
+    tk.messagebox.showerror("Error", f"Failed to switch the audio input; keeping the previous settings: {error}")
 
 # Main execution
 if __name__ == "__main__":
@@ -388,6 +777,16 @@ if __name__ == "__main__":
         sys.exit(1)
     setup_logging(config, correlation_id, trace_id)
     sys.excepthook = handle_unexpected_error
+    start_exporters(
+        config.get('metrics', {}),
+        get_absolute_path(config.get('Logging', {}).get('log_dir', 'logs/push_to_talk_logs'))
+    )
+
+    # Transcripts and audio clips are written on background threads
+    persistence_writer = PersistenceWriter(config.get('persistence', {}), correlation_id)
+
+    # Preallocate the recording buffer for the longest allowed recording
+    allocate_audio_buffer(config)
 
     # Initialize the GUI first
     root = tk.Tk()
@@ -399,25 +798,34 @@ if __name__ == "__main__":
         correlation_id,
         trace_id,
         None,
-        graceful_shutdown  # Pass the graceful_shutdown function as a callback
+        graceful_shutdown,  # Pass the graceful_shutdown function as a callback
+        model_manager=ModelManager(config, correlation_id)
     )
 
-    # Start loading the model in a separate thread
-    default_model_name = config.get('model_support', {}).get('default_model', 'base')
-    load_model_in_thread(default_model_name, gui)
+    text_injector = TextInjector(root, config.get('text_injection', {}), correlation_id)
+    gui.scheduler = TranscriptionScheduler(
+        lambda clips: transcribe_audio(clips, gui),
+        lambda job: deliver_transcription(job, gui),
+        config.get('transcription_queue', {}),
+        on_depth_change=lambda depth: on_queue_depth_change(gui, depth),
+        correlation_id=correlation_id
+    )
+
+    gui.exit_button.config(command=graceful_shutdown)
+    gui.on_settings_change = lambda new_config: apply_settings(gui, new_config)
+
+    # Staged startup: draw the window first, then bring up capture and the
+    # hotkey, and only then start on the model and the remaining heavy imports
+    root.update()
+    report_time_to_window()
 
     # Check dependencies before starting
     check_dependencies()
 
     try:
         device_index = config.get('audio_device_index', sd.default.device[0])
-        stream = start_audio_stream(
-            callback=lambda indata, frames, time_info, status: audio_callback(indata, frames, time_info, status, gui),
-            samplerate=config.get('samplerate', 16000),
-            channels=config.get('channels', 1),
-            dtype=config.get('dtype', 'float32'),
-            device=device_index
-        )
+        start_noise_reducer(config, device_index)
+        stream = open_audio_stream(gui, config, device_index)
     except AudioProcessingError as e:
         sanitized_error = sanitize_message(str(e))
         logger.error(
@@ -428,12 +836,23 @@ if __name__ == "__main__":
         tk.messagebox.showerror("Error", f"Failed to start audio input stream: {e}")
         graceful_shutdown()
 
-    listener_thread = threading.Thread(target=key_listener, args=(gui, config), daemon=True)
-    listener_thread.start()
+    start_hotkey_listener(gui, config)
+
+    # Start loading the model in a separate thread
+    default_model_name = config.get('model_support', {}).get('default_model', 'base')
+    load_model_in_thread(default_model_name, gui)
+    import_in_background(config.get('startup', {}).get('background_imports', BACKGROUND_IMPORTS))
 
     if config.get('enable_system_monitoring', True):
         system_monitor_thread = threading.Thread(target=log_system_usage, daemon=True)
         system_monitor_thread.start()
 
-    gui.exit_button.config(command=graceful_shutdown)
+    # Edits to config.yaml are picked up while running and applied on the Tk thread
+    reload_config = config.get('config_reload', {})
+    if reload_config.get('enabled', True):
+        config_watcher = ConfigWatcher(
+            lambda new_config: root.after(0, lambda: apply_settings(gui, new_config)),
+            interval=reload_config.get('interval', 1.0)
+        )
+
     root.mainloop()
@@ -0,0 +1,203 @@
+# metrics.py
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import psutil
+from state import correlation_id
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Prefix for every exported metric name
+METRIC_PREFIX = 'push_to_talk_'
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Counter:
+    """A monotonically increasing count."""
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+class Gauge:
+    """A value that can go up and down."""
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def snapshot(self):
+        return self.value
+
+class Histogram:
+    """Cumulative bucket counts plus sum, count, last and max of observed durations."""
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.last = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.last = value
+            self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'sum': self.sum,
+                'last': self.last,
+                'max': self.max,
+                'buckets': dict(zip((str(bound) for bound in self.buckets), self.bucket_counts)),
+            }
+
+class MetricsRegistry:
+    """Holds the application's counters, gauges and timing histograms."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, cls(name, help_text))
+        return metric
+
+    def counter(self, name, help_text=''):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text=''):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text=''):
+        return self._get_or_create(Histogram, name, help_text)
+
+    @contextmanager
+    def span(self, name, help_text=''):
+        """Times the enclosed block into the `<name>_seconds` histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(f"{name}_seconds", help_text).observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        """Returns every metric's current value, keyed by name."""
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    def render_prometheus(self):
+        """Formats all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            full_name = METRIC_PREFIX + name
+            if metric.help_text:
+                lines.append(f"# HELP {full_name} {metric.help_text}")
+            if isinstance(metric, Histogram):
+                snapshot = metric.snapshot()
+                lines.append(f"# TYPE {full_name} histogram")
+                for bound, count in snapshot['buckets'].items():
+                    lines.append(f'{full_name}_bucket{{le="{bound}"}} {count}')
+                lines.append(f'{full_name}_bucket{{le="+Inf"}} {snapshot["count"]}')
+                lines.append(f"{full_name}_sum {snapshot['sum']}")
+                lines.append(f"{full_name}_count {snapshot['count']}")
+            else:
+                kind = 'counter' if isinstance(metric, Counter) else 'gauge'
+                lines.append(f"# TYPE {full_name} {kind}")
+                lines.append(f"{full_name} {metric.snapshot()}")
+        return '\n'.join(lines) + '\n'
+
+# Shared registry for the application
+metrics = MetricsRegistry()
+
+def update_process_gauges():
+    """Samples process memory and CPU without blocking."""
+    process = psutil.Process(os.getpid())
+    metrics.gauge('process_resident_memory_bytes', "Resident memory of the application.").set(process.memory_info().rss)
+    # interval=None compares against the previous call instead of sleeping
+    metrics.gauge('process_cpu_percent', "CPU usage since the previous sample.").set(process.cpu_percent(interval=None))
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        update_process_gauges()
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the application log
+        pass
+
+def _dump_json_periodically(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            update_process_gauges()
+            temp_path = path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'timestamp': time.time(), 'metrics': metrics.snapshot()}, f, indent=2)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write metrics dump: {e}", extra={'correlation_id': correlation_id})
+
+def start_exporters(metrics_config, log_dir):
+    """Starts the HTTP endpoint and the periodic JSON dump enabled in the configuration."""
+    if not metrics_config.get('enabled', True):
+        return
+    port = metrics_config.get('http_port', 0)
+    if port:
+        try:
+            # Bound to localhost only; the endpoint is for local scraping
+            server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            logger.info(f"Metrics endpoint listening on http://127.0.0.1:{port}/metrics", extra={'correlation_id': correlation_id})
+        except OSError as e:
+            logger.error(f"Failed to start metrics endpoint on port {port}: {e}", extra={'correlation_id': correlation_id})
+    interval = metrics_config.get('json_dump_interval', 60)
+    if interval:
+        os.makedirs(log_dir, exist_ok=True)
+        path = os.path.join(log_dir, 'metrics.json')
+        threading.Thread(target=_dump_json_periodically, args=(path, interval), daemon=True).start()
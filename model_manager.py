@@ -0,0 +1,86 @@
+# model_manager.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from transcription import load_transcription_backend
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+class ModelManager:
+    """
+    Keeps recently used transcription backends loaded.
+
+    Up to `model_support.resident_models` backends stay in memory; asking for
+    one that is already resident returns it immediately, and the least
+    recently used one is closed when the limit is exceeded. Models load
+    outside the lock, so a slow load never delays lookups of resident ones;
+    threads asking for a model that is already loading wait for that load.
+    """
+    def __init__(self, config, correlation_id):
+        self.config = config
+        self.correlation_id = correlation_id
+        self._models = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.load_times = {}
+
+    @property
+    def max_resident(self):
+        return max(1, self.config.get('model_support', {}).get('resident_models', 2))
+
+    def is_resident(self, model_name):
+        """Returns True if the model is already loaded."""
+        return model_name in self._models
+
+    def resident(self, model_name):
+        """Returns the backend for `model_name` if it is loaded, otherwise None; never loads or waits."""
+        # A single dict read is atomic, so this never waits behind a load
+        return self._models.get(model_name)
+
+    def get(self, model_name):
+        """Returns the backend for `model_name`, loading and warming it up if it is not resident."""
+        while True:
+            with self._lock:
+                backend = self._models.get(model_name)
+                if backend is not None:
+                    self._models.move_to_end(model_name)
+                    logger.info(f"Reusing resident model '{model_name}'.", extra={'correlation_id': self.correlation_id})
+                    return backend
+                loading = self._loading.get(model_name)
+                if loading is None:
+                    loading = self._loading[model_name] = threading.Event()
+                    break
+            # Another thread is loading it; if that load fails, this one tries again
+            loading.wait()
+        try:
+            start = time.monotonic()
+            backend = load_transcription_backend(model_name, self.config, self.correlation_id)
+            self.load_times[model_name] = time.monotonic() - start
+            logger.info(
+                f"Model '{model_name}' loaded and warmed up in {self.load_times[model_name]:.2f}s.",
+                extra={'correlation_id': self.correlation_id}
+            )
+            evicted = []
+            with self._lock:
+                self._models[model_name] = backend
+                while len(self._models) > self.max_resident:
+                    evicted.append(self._models.popitem(last=False))
+        finally:
+            with self._lock:
+                del self._loading[model_name]
+            loading.set()
+        for evicted_name, evicted_backend in evicted:
+            evicted_backend.close()
+            logger.info(f"Evicted model '{evicted_name}' from memory.", extra={'correlation_id': self.correlation_id})
+        return backend
+
+    def close_all(self):
+        """Releases every resident backend."""
+        with self._lock:
+            models = list(self._models.values())
+            self._models.clear()
+        for backend in models:
+            backend.close()
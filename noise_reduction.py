@@ -0,0 +1,235 @@
+# noise_reduction.py
+
+import logging
+import os
+import re
+import threading
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from logger import sanitize_message
+from state import correlation_id
+from utils import get_absolute_path
+from capture import to_float32
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Keeps log10 finite on digital silence
+_EPSILON = 1e-10
+
+class SpectralGate:
+    """
+    STFT spectral gate driven by a per-frequency noise profile.
+
+    The profile is the mean and standard deviation of the noise level in each
+    frequency bin, in dB. Bins that do not rise `threshold_std` deviations
+    above the noise mean are attenuated by `prop_decrease`. Frames are
+    processed independently, so one gate can serve several recordings.
+    """
+    def __init__(self, samplerate, n_fft=512, threshold_std=1.5, prop_decrease=0.9, profile_smoothing=0.2):
+        self.samplerate = samplerate
+        self.n_fft = n_fft
+        self.hop = n_fft // 2
+        self.threshold_std = threshold_std
+        self.prop_decrease = prop_decrease
+        self.profile_smoothing = profile_smoothing
+        # Square-root Hann for analysis and synthesis sums to one at 50% overlap
+        self.window = np.sqrt(np.hanning(n_fft + 1)[:-1]).astype(np.float32)
+        self.noise_mean_db = None
+        self.noise_std_db = None
+
+    @property
+    def has_profile(self):
+        return self.noise_mean_db is not None
+
+    def _spectrum(self, frames):
+        return np.fft.rfft(frames * self.window, axis=1)
+
+    def _frames(self, audio):
+        return sliding_window_view(audio, self.n_fft)[::self.hop]
+
+    def learn(self, audio):
+        """Updates the noise profile from audio that should contain no speech."""
+        if len(audio) < self.n_fft:
+            return
+        audio = to_float32(audio)
+        levels = 20 * np.log10(np.abs(self._spectrum(self._frames(audio))) + _EPSILON)
+        if self.has_profile:
+            # Ignore frames clearly louder than the known noise, e.g. someone talking
+            quiet = levels.mean(axis=1) < self.noise_mean_db.mean() + 6
+            levels = levels[quiet]
+            if len(levels) == 0:
+                return
+        mean_db = levels.mean(axis=0)
+        std_db = levels.std(axis=0)
+        if self.has_profile:
+            alpha = self.profile_smoothing
+            mean_db = (1 - alpha) * self.noise_mean_db + alpha * mean_db
+            std_db = (1 - alpha) * self.noise_std_db + alpha * std_db
+        # Replace both arrays at once so concurrent readers see a consistent pair
+        self.noise_mean_db, self.noise_std_db = mean_db, std_db
+
+    def process_frames(self, frames):
+        """Gates a stack of frames and returns them windowed for overlap-add."""
+        spectrum = self._spectrum(frames)
+        noise_mean_db, noise_std_db = self.noise_mean_db, self.noise_std_db
+        if noise_mean_db is not None:
+            levels = 20 * np.log10(np.abs(spectrum) + _EPSILON)
+            speech = (levels > noise_mean_db + self.threshold_std * noise_std_db).astype(np.float32)
+            # Smooth the mask across neighbouring bins to avoid isolated tones
+            mask = (speech[:, :-2] + speech[:, 1:-1] + speech[:, 2:]) / 3.0
+            mask = np.pad(mask, ((0, 0), (1, 1)), mode='edge')
+            spectrum *= 1.0 - self.prop_decrease * (1.0 - mask)
+        return np.fft.irfft(spectrum, n=self.n_fft, axis=1).astype(np.float32) * self.window
+
+    def save(self, path):
+        """Writes the noise profile to disk."""
+        if not self.has_profile:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp.npz"
+        np.savez(temp_path, mean_db=self.noise_mean_db, std_db=self.noise_std_db,
+                 n_fft=self.n_fft, samplerate=self.samplerate)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Reads a noise profile saved with the same FFT size and sample rate. Returns True on success."""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if int(data['n_fft']) != self.n_fft or int(data['samplerate']) != self.samplerate:
+                return False
+            self.noise_mean_db, self.noise_std_db = data['mean_db'], data['std_db']
+        return True
+
+class DenoiseJob:
+    """Denoises one recording incrementally as its samples arrive."""
+    def __init__(self, gate, capacity):
+        self.gate = gate
+        self.output = np.zeros(capacity, dtype=np.float32)
+        self.next_frame = 0
+        self._lock = threading.Lock()
+
+    def feed(self, audio):
+        """Processes every complete frame of `audio` not processed yet."""
+        with self._lock:
+            self._process(audio, len(audio))
+
+    def _process(self, audio, available):
+        gate = self.gate
+        if not gate.has_profile:
+            # No idle audio was seen yet; fall back to the start of the recording
+            learn_length = int(0.5 * gate.samplerate)
+            if available < learn_length:
+                return
+            gate.learn(audio[:learn_length])
+        if available - self.next_frame < gate.n_fft:
+            return
+        frame_count = (available - self.next_frame - gate.n_fft) // gate.hop + 1
+        end = self.next_frame + (frame_count - 1) * gate.hop + gate.n_fft
+        frames = sliding_window_view(to_float32(audio[self.next_frame:end]), gate.n_fft)[::gate.hop]
+        processed = gate.process_frames(frames)
+        # Overlap-add: even and odd frames never overlap each other, so each
+        # half can be added in one vectorized step
+        for parity in (0, 1):
+            subset = processed[parity::2]
+            if len(subset) == 0:
+                continue
+            start = self.next_frame + parity * gate.hop
+            target = self.output[start:start + len(subset) * gate.n_fft]
+            target += subset.reshape(-1)[:len(target)]
+        self.next_frame += frame_count * gate.hop
+
+    def denoised(self):
+        """Returns the samples denoised so far; later frames no longer change them."""
+        # Read the frame position first: output before it is complete once next_frame is advanced
+        next_frame = self.next_frame
+        return self.output[:next_frame]
+
+    def finish(self, audio):
+        """Processes the remaining tail and returns the denoised recording."""
+        with self._lock:
+            length = len(audio)
+            # Zero-pad so the last partial frame is processed too
+            padded_length = length + self.gate.n_fft
+            if padded_length > len(self.output):
+                self.output = np.concatenate([self.output, np.zeros(padded_length - len(self.output), dtype=np.float32)])
+            tail = np.zeros(padded_length, dtype=np.float32)
+            tail[self.next_frame:length] = to_float32(audio[self.next_frame:length])
+            self._process(tail, padded_length)
+            return self.output[:length]
+
+def profile_path(profile_dir, device_name):
+    """Returns the noise profile file for an input device."""
+    safe_name = re.sub(r'[^\w.-]+', '_', device_name or 'default').strip('_')
+    return os.path.join(get_absolute_path(profile_dir), f"{safe_name}.npz")
+
+class StreamingNoiseReducer:
+    """
+    Runs the spectral gate alongside audio capture.
+
+    While idle, a worker thread refines the noise profile from the pre-roll
+    audio in the buffer. While recording, it denoises new samples as they
+    arrive, so at release only the last fraction of a second is left. The
+    profile is cached in memory across recordings and saved per input device.
+    """
+    def __init__(self, audio_buffer, samplerate, noise_config, device_name):
+        self.audio_buffer = audio_buffer
+        self.gate = SpectralGate(
+            samplerate,
+            n_fft=noise_config.get('n_fft', 512),
+            threshold_std=noise_config.get('threshold_std', 1.5),
+            prop_decrease=noise_config.get('prop_decrease', 0.9),
+            profile_smoothing=noise_config.get('profile_smoothing', 0.2)
+        )
+        self.poll_interval = noise_config.get('poll_interval', 0.1)
+        self.profile_update_interval = noise_config.get('profile_update_interval', 1.0)
+        self.path = profile_path(noise_config.get('profile_dir', 'noise_profiles'), device_name)
+        self._job = None
+        self._stop_event = threading.Event()
+        try:
+            if self.gate.load(self.path):
+                logger.info(f"Loaded noise profile from {self.path}", extra={'correlation_id': correlation_id})
+        except Exception as e:
+            sanitized_error = sanitize_message(str(e))
+            logger.warning(f"Ignoring unreadable noise profile: {sanitized_error}", extra={'correlation_id': correlation_id})
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def start_recording(self):
+        """Begins denoising a new recording and returns its job."""
+        self._job = DenoiseJob(self.gate, self.audio_buffer.capacity_frames * self.audio_buffer.channels)
+        return self._job
+
+    def detach(self):
+        """Hands over the current recording's job; call finish(audio) on it to get the denoised audio."""
+        job, self._job = self._job, None
+        return job
+
+    def _run(self):
+        idle_time = 0.0
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                job = self._job
+                if job is not None:
+                    job.feed(self.audio_buffer.view().reshape(-1))
+                    continue
+                idle_time += self.poll_interval
+                if idle_time >= self.profile_update_interval:
+                    idle_time = 0.0
+                    self.gate.learn(self.audio_buffer.view().reshape(-1))
+            except Exception as e:
+                sanitized_error = sanitize_message(str(e))
+                logger.error(f"Streaming noise reduction failed: {sanitized_error}", extra={'correlation_id': correlation_id}, exc_info=True)
+
+    def save_profile(self):
+        """Persists the noise profile for this input device."""
+        try:
+            self.gate.save(self.path)
+        except Exception as e:
+            sanitized_error = sanitize_message(str(e))
+            logger.warning(f"Failed to save noise profile: {sanitized_error}", extra={'correlation_id': correlation_id})
+
+    def close(self):
+        """Stops the worker thread and saves the profile."""
+        self._stop_event.set()
+        self.save_profile()
@@ -0,0 +1,177 @@
+# persistence.py
+
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+import soundfile as sf
+from logger import sanitize_message
+from metrics import metrics
+from utils import get_absolute_path
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# soundfile format, subtype and file extension for each supported audio format
+AUDIO_FORMATS = {
+    'flac': ('FLAC', 'PCM_16', 'flac'),
+    'opus': ('OGG', 'OPUS', 'ogg'),
+}
+
+# Marks the end of a queue when the writer is closed
+_STOP = object()
+
+class PersistenceWriter:
+    """
+    Saves transcripts and audio clips on background threads.
+
+    Transcripts are appended as JSON lines to one log per day; whatever has
+    queued up since the last write goes out in a single batch. Audio clips are
+    encoded on their own thread so a slow disk never holds up the transcripts.
+    Both queues are bounded, and `close` writes everything still queued.
+    """
+    def __init__(self, persistence_config, correlation_id):
+        self.correlation_id = correlation_id
+        self.audio_format = persistence_config.get('audio_format', 'flac')
+        if self.audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format '{self.audio_format}'. Use one of: {', '.join(AUDIO_FORMATS)}")
+        self.fsync = persistence_config.get('fsync', False)
+        self.put_timeout = persistence_config.get('put_timeout', 1.0)
+        max_queued = persistence_config.get('max_queued_items', 100)
+        self._transcripts = queue.Queue(maxsize=max_queued)
+        self._audio = queue.Queue(maxsize=max_queued)
+        self._log_file = None
+        self._log_path = None
+        self._created_directories = set()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._write_transcripts, name="transcript-writer", daemon=True),
+            threading.Thread(target=self._write_audio, name="audio-writer", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def audio_filename(self, timestamp):
+        """Returns the file name an audio clip recorded at `timestamp` will be saved under."""
+        extension = AUDIO_FORMATS[self.audio_format][2]
+        return f"audio_{timestamp.strftime('%m-%d-%Y_%H-%M-%S_%f')}.{extension}"
+
+    def _put(self, target, item, kind):
+        if self._closed:
+            logger.warning(f"Dropped {kind}: the writer is closed.", extra={'correlation_id': self.correlation_id})
+            return False
+        try:
+            target.put(item, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            metrics.counter('persistence_dropped_total', "Transcripts or clips dropped because the write queue was full.").inc()
+            logger.error(f"Write queue is full; dropped {kind}.", extra={'correlation_id': self.correlation_id})
+            return False
+
+    def save_transcription(self, record, save_directory):
+        """Queues a transcript record (a dict with at least 'text') for the daily log in `save_directory`."""
+        record.setdefault('timestamp', datetime.now().isoformat())
+        return self._put(self._transcripts, (record, save_directory), "transcript")
+
+    def save_audio(self, audio_data, save_directory, filename, samplerate):
+        """Queues an audio clip to be encoded and written as `filename` in `save_directory`."""
+        return self._put(self._audio, (audio_data, save_directory, filename, samplerate), "audio clip")
+
+    def _directory(self, save_directory):
+        directory = get_absolute_path(save_directory)
+        # Create each directory once instead of on every write
+        if directory not in self._created_directories:
+            os.makedirs(directory, exist_ok=True)
+            self._created_directories.add(directory)
+        return directory
+
+    def _log_for(self, save_directory):
+        path = os.path.join(self._directory(save_directory), f"transcripts_{datetime.now().strftime('%Y-%m-%d')}.jsonl")
+        if path != self._log_path:
+            # First write, a new day or a changed save directory
+            if self._log_file is not None:
+                self._log_file.close()
+            self._log_file = open(path, 'a', encoding='utf-8')
+            self._log_path = path
+        return self._log_file
+
+    def _write_transcripts(self):
+        stopping = False
+        while not stopping:
+            batch = [self._transcripts.get()]
+            # Coalesce everything that queued up meanwhile into one write
+            while True:
+                try:
+                    batch.append(self._transcripts.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [item for item in batch if item is not _STOP]
+            if batch:
+                self._append_records(batch)
+        if self._log_file is not None:
+            self._log_file.close()
+
+    def _append_records(self, items):
+        records = [record for record, _ in items]
+        try:
+            # Records are grouped by directory in case it changed while they were queued
+            for save_directory in dict.fromkeys(directory for _, directory in items):
+                log_file = self._log_for(save_directory)
+                log_file.write(''.join(
+                    json.dumps(record, ensure_ascii=False) + '\n' for record, directory in items if directory == save_directory
+                ))
+                log_file.flush()
+                if self.fsync:
+                    os.fsync(log_file.fileno())
+            metrics.counter('transcripts_saved_total', "Transcripts appended to the daily log.").inc(len(records))
+        except Exception as e:
+            sanitized_error = sanitize_message(str(e))
+            logger.error(
+                f"Failed to save {len(records)} transcription(s): {sanitized_error}",
+                extra={'correlation_id': self.correlation_id},
+                exc_info=True
+            )
+            # Reopen on the next batch in case the file handle went bad
+            self._log_path = None
+            self._created_directories.clear()
+
+    def _write_audio(self):
+        format_name, subtype, _ = AUDIO_FORMATS[self.audio_format]
+        while True:
+            item = self._audio.get()
+            if item is _STOP:
+                break
+            audio_data, save_directory, filename, samplerate = item
+            try:
+                path = os.path.join(self._directory(save_directory), filename)
+                with metrics.span('save_audio', "Time to encode and write an audio clip."):
+                    sf.write(path, audio_data, samplerate, format=format_name, subtype=subtype)
+                logger.info(f"Audio clip saved to {path}", extra={'correlation_id': self.correlation_id})
+            except Exception as e:
+                sanitized_error = sanitize_message(str(e))
+                logger.error(
+                    f"Failed to save audio clip: {sanitized_error}",
+                    extra={'correlation_id': self.correlation_id},
+                    exc_info=True
+                )
+
+    def close(self, timeout=10):
+        """Writes everything still queued and stops the writer threads."""
+        if self._closed:
+            return
+        self._closed = True
+        # The sentinels go in behind every queued item; a queue that stays full
+        # means its writer is stuck or dead, so shutdown does not wait forever
+        for target, thread in zip((self._transcripts, self._audio), self._threads):
+            try:
+                target.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning(f"{thread.name} queue is still full at shutdown; queued items are lost.", extra={'correlation_id': self.correlation_id})
+                continue
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"{thread.name} did not finish writing before shutdown.", extra={'correlation_id': self.correlation_id})
@@ -8,6 +8,7 @@ from utils import get_absolute_path, create_tooltip
 from logger import sanitize_message
 import threading
 import sounddevice as sd
+from hotkey import HOTKEY_MODES
 
 # Set up module-specific logger
 logger = logging.getLogger(__name__)
@@ -70,11 +71,11 @@ class PreferencesWindow:
             self.key_combination_entries.append(entry)
             create_tooltip(entry, f"Set key {i+1} for the key combination.")
 
-        ttk.Label(key_listener_frame, text="Key Listener Sleep (seconds):", font=("Helvetica", 10)).pack(anchor='w', pady=(10, 0), padx=10)
-        self.key_listener_sleep_var = tk.DoubleVar(value=self.config.get('key_listener_sleep', 0.1))
-        self.key_listener_sleep_entry = ttk.Entry(key_listener_frame, textvariable=self.key_listener_sleep_var)
-        self.key_listener_sleep_entry.pack(fill='x', padx=10, pady=5)
-        create_tooltip(self.key_listener_sleep_entry, "Time to wait between key listener checks (in seconds).")
+        ttk.Label(key_listener_frame, text="Hotkey Mode:", font=("Helvetica", 10)).pack(anchor='w', pady=(10, 0), padx=10)
+        self.hotkey_mode_var = tk.StringVar(value=self.config.get('hotkey_mode', 'toggle'))
+        self.hotkey_mode_dropdown = ttk.Combobox(key_listener_frame, values=list(HOTKEY_MODES), textvariable=self.hotkey_mode_var, state='readonly')
+        self.hotkey_mode_dropdown.pack(fill='x', padx=10, pady=5)
+        create_tooltip(self.hotkey_mode_dropdown, "'toggle': press once to start and again to stop. 'hold': record while the keys are held down.")
 
         # GUI Preferences Tab
         gui_frame = ttk.Frame(notebook)
@@ -142,45 +143,43 @@ class PreferencesWindow:
 
     def save_preferences(self):
         """Saves the preferences to the config file."""
+        # The loaded settings are read-only; edit a copy and save that
+        config = self.config.thaw()
+
         # Update model settings
         selected_model = self.model_var.get()
-        self.config['model_support']['default_model'] = selected_model
+        config['model_support']['default_model'] = selected_model
 
         # Update key listener settings
         new_keys = [var.get().strip().lower() for var in self.key_combination_vars]
         if not all(new_keys):
             messagebox.showerror("Error", "All key combination fields must be filled.")
             return
-        self.config['key_combination'] = new_keys
+        config['key_combination'] = new_keys
 
-        # Update key listener sleep
-        try:
-            sleep_time = float(self.key_listener_sleep_var.get())
-            self.config['key_listener_sleep'] = sleep_time
-        except ValueError:
-            messagebox.showerror("Error", "Key Listener Sleep must be a number.")
-            return
+        # Update hotkey mode
+        config['hotkey_mode'] = self.hotkey_mode_var.get()
 
         # Update GUI settings
-        self.config.setdefault('gui_settings', {})
-        self.config['gui_settings']['always_on_top'] = self.always_on_top_var.get()
+        config.setdefault('gui_settings', {})
+        config['gui_settings']['always_on_top'] = self.always_on_top_var.get()
 
         # Update logging settings
         selected_log_level = self.log_level_var.get()
-        self.config.setdefault('Logging', {})
-        self.config['Logging']['log_level'] = selected_log_level
+        config.setdefault('Logging', {})
+        config['Logging']['log_level'] = selected_log_level
 
         # Update audio device setting
         selected_device_name = self.device_var.get()
         selected_device = next((device for device in self.input_devices if device['name'] == selected_device_name), None)
         if selected_device:
-            self.config['audio_device_index'] = selected_device['index']
+            config['audio_device_index'] = selected_device['index']
         else:
             messagebox.showerror("Error", "Selected audio device not found.")
             return
 
         try:
-            save_config(self.config)
+            save_config(config)
             logger.info(
                 "Preferences saved successfully.",
                 extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id}
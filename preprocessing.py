@@ -0,0 +1,52 @@
+# preprocessing.py
+
+import logging
+import time
+from vad import trim_silence
+from capture import to_float32
+from state import correlation_id
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+def preprocess_audio(audio_data, config, timings=None, denoised=False, staging=None):
+    """
+    Converts captured audio to float32, trims silence and applies noise reduction if enabled.
+
+    Returns the processed audio and the kept segments as (start, end) sample
+    offsets into the input, so model timestamps can be mapped back. When a
+    `timings` dict is given, the wall time of each stage is stored in it.
+    Pass `denoised=True` for audio the streaming noise reducer already cleaned.
+    Integer PCM is converted into `staging`, a preallocated float32 array,
+    when one is given; float32 input is used without a copy.
+    """
+    if timings is None:
+        timings = {}
+    start = time.perf_counter()
+    audio_data = to_float32(audio_data, staging)
+    timings['convert'] = time.perf_counter() - start
+    samplerate = config.recording_samplerate
+    # Estimate noise from the first 0.5 seconds, before silence trimming removes it
+    noise_sample = audio_data[:int(0.5 * samplerate)]
+    segments = [(0, len(audio_data))]
+    vad_config = config.get('vad', {})
+    if vad_config.get('enabled', True):
+        start = time.perf_counter()
+        original_length = len(audio_data)
+        audio_data, segments = trim_silence(audio_data, samplerate, vad_config)
+        timings['vad'] = time.perf_counter() - start
+        logger.info(
+            f"Silence trimming kept {len(audio_data) / samplerate:.2f}s of {original_length / samplerate:.2f}s.",
+            extra={'correlation_id': correlation_id}
+        )
+        if len(audio_data) == 0:
+            return audio_data, segments
+    # Apply noise reduction
+    if config.get('enable_noise_reduction', True) and not denoised:
+        logger.info("Applying noise reduction...", extra={'correlation_id': correlation_id})
+        # Imported on first use; it pulls in scipy, which slows startup
+        import noisereduce as nr
+        start = time.perf_counter()
+        audio_data = nr.reduce_noise(y=audio_data, sr=samplerate, y_noise=noise_sample)
+        timings['noise_reduction'] = time.perf_counter() - start
+    return audio_data, segments
@@ -0,0 +1,151 @@
+# result_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from logger import sanitize_message
+from metrics import metrics
+from transcription import TranscriptionBackend, TranscriptionResult
+from utils import get_absolute_path
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Backend options that do not change the decoded text
+_NON_DECODE_OPTIONS = ('cache_dir', 'download_root', 'cpu_threads')
+
+class ResultCache:
+    """
+    Transcription results on disk in sqlite, keyed by content.
+
+    Entries are evicted least recently used first once their total size
+    exceeds `max_bytes`. Several processes may share one database file; each
+    keeps a running total from its own writes and only sums the table again
+    once that total passes the bound, so the bound can be exceeded by what
+    other processes wrote in the meantime.
+    """
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, text TEXT, segments TEXT, language TEXT, "
+                "size INTEGER, last_used REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._total = self._stored_bytes()
+
+    def _stored_bytes(self):
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, key):
+        """Returns the cached TranscriptionResult for `key`, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT text, segments, language FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._connection:
+                self._connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        text, segments, language = row
+        return TranscriptionResult(text, json.loads(segments), language)
+
+    def put(self, key, result):
+        """Stores a result and evicts the least recently used entries beyond the size bound."""
+        segments = json.dumps(result.segments)
+        size = len(result.text.encode('utf-8')) + len(segments)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (key, result.text, segments, result.language, size, time.time())
+            )
+            # Replacing an existing key over-counts, which only brings the next full sum forward
+            self._total += size
+            if self._total <= self.max_bytes:
+                return
+            total = self._stored_bytes()
+            evicted = 0
+            for old_key, old_size in self._connection.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                total -= old_size
+                evicted += 1
+            self._total = total
+        metrics.counter('result_cache_evictions_total', "Cached transcriptions evicted to stay within the size bound.").inc(evicted)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+def cache_key(audio, engine):
+    """Hashes the preprocessed PCM together with the engine, model and decode options."""
+    options = {name: value for name, value in engine.options.items() if name not in _NON_DECODE_OPTIONS}
+    digest = hashlib.blake2b(np.ascontiguousarray(audio, dtype=np.float32).data, digest_size=16)
+    digest.update(json.dumps([engine.name, engine.model_name, options], sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+class CachedBackend(TranscriptionBackend):
+    """
+    Wraps a backend so identical audio is only transcribed once.
+
+    `engine` is the backend that actually decodes, which differs from
+    `backend` when inference runs in the worker pool; its name and options
+    go into the cache key.
+    """
+    def __init__(self, backend, cache, engine=None):
+        super().__init__(backend.model_name, backend.options, backend.correlation_id)
+        self.backend = backend
+        self.cache = cache
+        self.engine = engine or backend
+        self.name = backend.name
+
+    def __getattr__(self, attribute):
+        # Anything not overridden here, such as the pool's pending_jobs, comes from the wrapped backend
+        return getattr(self.backend, attribute)
+
+    def load(self):
+        self.backend.load()
+
+    def warmup(self):
+        # Warmup has to reach the model; a cache hit would skip it
+        self.backend.warmup()
+
+    def transcribe(self, audio):
+        key = cache_key(audio, self.engine)
+        try:
+            result = self.cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Result cache lookup failed: {sanitize_message(str(e))}", extra={'correlation_id': self.correlation_id})
+            result = None
+        if result is not None:
+            metrics.counter('result_cache_hits_total', "Transcriptions served from the result cache.").inc()
+            return result
+        metrics.counter('result_cache_misses_total', "Transcriptions that had to run the model.").inc()
+        result = self.backend.transcribe(audio)
+        try:
+            self.cache.put(key, result)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to store result in cache: {sanitize_message(str(e))}", extra={'correlation_id': self.correlation_id})
+        return result
+
+    def close(self):
+        self.backend.close()
+        self.cache.close()
+
+def open_result_cache(cache_config):
+    """Opens the result cache described by the `result_cache` configuration section."""
+    return ResultCache(
+        get_absolute_path(cache_config.get('path', 'model_cache/results.sqlite')),
+        int(cache_config.get('max_size_mb', 64) * 1024 * 1024)
+    )
@@ -0,0 +1,163 @@
+# scheduler.py
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from logger import sanitize_message
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# What happens to a new recording when the queue is full
+OVERLOAD_POLICIES = ('merge', 'drop_oldest')
+
+class Clip:
+    """One recording and the per-recording state that travels with it."""
+    __slots__ = ('audio', 'stop_time', 'streamer', 'denoise_job')
+
+    def __init__(self, audio, stop_time=None, streamer=None, denoise_job=None):
+        self.audio = audio
+        self.stop_time = stop_time
+        self.streamer = streamer
+        self.denoise_job = denoise_job
+
+class TranscriptionJob:
+    """Clips transcribed together; more than one only after an overload merge."""
+    def __init__(self, sequence, clip):
+        self.sequence = sequence
+        self.clips = [clip]
+        self.result = None
+        self.error = None
+        self.dropped = False
+
+class TranscriptionScheduler:
+    """
+    Runs recordings through a fixed set of inference workers.
+
+    Jobs wait in a bounded FIFO queue. When it is full, the newest recording is
+    either appended to the last queued job ('merge') or the oldest queued job
+    is dropped ('drop_oldest'). Results are passed to `deliver` strictly in
+    recording order, even when several workers finish out of order.
+    """
+    def __init__(self, process, deliver, scheduler_config, on_depth_change=None, correlation_id=None):
+        self.process = process
+        self.deliver = deliver
+        self.on_depth_change = on_depth_change
+        self.correlation_id = correlation_id
+        self.max_queued = max(1, scheduler_config.get('max_queued', 4))
+        self.overload_policy = scheduler_config.get('overload_policy', 'merge')
+        if self.overload_policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy '{self.overload_policy}'. Use one of: {', '.join(OVERLOAD_POLICIES)}")
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        # Finished jobs waiting for earlier ones, keyed by sequence number
+        self._finished = {}
+        self._next_delivery = 0
+        self._delivery_lock = threading.Lock()
+        self._depth = 0
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"transcription-scheduler-{index}", daemon=True)
+            for index in range(max(1, scheduler_config.get('workers', 1)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def depth(self):
+        """Jobs queued, being transcribed or waiting for delivery."""
+        return self._depth
+
+    def _set_depth(self, change):
+        # Called with the condition held
+        self._depth += change
+        if self.on_depth_change is not None:
+            self.on_depth_change(self._depth)
+
+    def submit(self, clip):
+        """Queues a recording for transcription."""
+        dropped = None
+        with self._condition:
+            if len(self._queue) >= self.max_queued:
+                if self.overload_policy == 'merge':
+                    self._queue[-1].clips.append(clip)
+                    logger.warning(
+                        "Transcription queue full; merged the recording into the last queued one.",
+                        extra={'correlation_id': self.correlation_id}
+                    )
+                    return
+                dropped = self._queue.popleft()
+                dropped.dropped = True
+                for dropped_clip in dropped.clips:
+                    if dropped_clip.streamer is not None:
+                        dropped_clip.streamer.cancel()
+                logger.warning(
+                    "Transcription queue full; dropped the oldest queued recording.",
+                    extra={'correlation_id': self.correlation_id}
+                )
+            self._queue.append(TranscriptionJob(next(self._sequence), clip))
+            self._set_depth(1)
+            self._condition.notify()
+        if dropped is not None:
+            # Its turn in the delivery order still has to be released
+            self._complete(dropped)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._queue:
+                    return
+                job = self._queue.popleft()
+            try:
+                job.result = self.process(job.clips)
+            except Exception as e:
+                job.error = e
+            self._complete(job)
+
+    def _complete(self, job):
+        with self._condition:
+            self._finished[job.sequence] = job
+        # One thread delivers at a time, in sequence order
+        with self._delivery_lock:
+            while True:
+                with self._condition:
+                    ready = self._finished.pop(self._next_delivery, None)
+                    if ready is None:
+                        return
+                    self._next_delivery += 1
+                if not ready.dropped:
+                    try:
+                        self.deliver(ready)
+                    except Exception as e:
+                        sanitized_error = sanitize_message(str(e))
+                        logger.error(f"Failed to deliver a transcription: {sanitized_error}", extra={'correlation_id': self.correlation_id}, exc_info=True)
+                with self._condition:
+                    self._set_depth(-1)
+
+    def close(self, timeout=30.0):
+        """
+        Transcribes and delivers the recordings still queued, then stops the workers.
+
+        Waits up to `timeout` seconds in total and returns whether every
+        worker finished.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        deadline = time.monotonic() + timeout
+        # A worker cannot wait for itself, e.g. if a delivery triggered the shutdown
+        workers = [thread for thread in self._threads if thread is not threading.current_thread()]
+        for thread in workers:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if any(thread.is_alive() for thread in workers):
+            logger.warning(
+                f"Transcription did not finish before shutdown; {self._depth} recording(s) were not delivered.",
+                extra={'correlation_id': self.correlation_id}
+            )
+            return False
+        return True
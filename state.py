@@ -1,6 +1,7 @@
 # state.py
 import threading
 import uuid
+from audio_buffer import AudioBuffer
 
 # Lock for synchronizing access to shared resources
 lock = threading.Lock()
@@ -8,8 +9,8 @@ lock = threading.Lock()
 # Flag to signal threads to exit
 should_exit = False
 
-# Shared audio buffer
-audio_buffer = []
+# Shared audio buffer, sized from the configuration at startup
+audio_buffer = AudioBuffer()
 
 # Unique correlation ID for the session
 correlation_id = str(uuid.uuid4())
@@ -0,0 +1,123 @@
+# streaming.py
+
+import re
+import threading
+import logging
+import numpy as np
+from logger import sanitize_message
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Frame length used when looking for a quiet cut point
+BOUNDARY_FRAME_SECONDS = 0.02
+
+def find_quiet_boundary(audio, start, end, frame_length):
+    """Returns the start of the lowest-energy frame in audio[start:end]."""
+    if end - start < frame_length * 2:
+        return end
+    # Integer PCM would overflow the energy sums
+    region = audio[start:end].astype(np.float32, copy=False)
+    frame_count = len(region) // frame_length
+    frames = region[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy = np.einsum('ij,ij->i', frames, frames)
+    return start + int(np.argmin(energy)) * frame_length
+
+def _normalize_word(word):
+    return re.sub(r'[^\w]', '', word.lower())
+
+def stitch_text(previous, new, max_overlap_words=20):
+    """Joins two partial transcripts, dropping words repeated across the window overlap."""
+    if not previous:
+        return new.strip()
+    if not new.strip():
+        return previous
+    previous_words = previous.split()
+    new_words = new.split()
+    previous_norm = [_normalize_word(w) for w in previous_words[-max_overlap_words:]]
+    new_norm = [_normalize_word(w) for w in new_words[:max_overlap_words]]
+    overlap = 0
+    for size in range(min(len(previous_norm), len(new_norm)), 0, -1):
+        if previous_norm[-size:] == new_norm[:size]:
+            overlap = size
+            break
+    remainder = ' '.join(new_words[overlap:])
+    return f"{previous} {remainder}".strip()
+
+class StreamingTranscriber:
+    """
+    Transcribes completed windows of a recording while it is still running.
+
+    A worker thread polls `audio_source` for the samples captured so far,
+    either the shared audio buffer or the streaming noise reducer's output.
+    Each time a full window
+    has been captured it cuts at the quietest frame near the window end,
+    transcribes the window (plus a short overlap with the previous one) and
+    stitches the text. When recording stops only the tail after the last cut
+    is left to decode.
+    """
+    def __init__(self, audio_source, transcribe_fn, samplerate, streaming_config, correlation_id, trace_id):
+        self.audio_source = audio_source
+        self.transcribe_fn = transcribe_fn
+        self.correlation_id = correlation_id
+        self.trace_id = trace_id
+        self.window_samples = int(streaming_config.get('window_seconds', 8) * samplerate)
+        self.overlap_samples = int(streaming_config.get('overlap_seconds', 1) * samplerate)
+        self.search_samples = int(streaming_config.get('boundary_search_seconds', 2) * samplerate)
+        self.poll_interval = streaming_config.get('poll_interval', 0.25)
+        self.frame_length = max(1, int(BOUNDARY_FRAME_SECONDS * samplerate))
+        self.text = ''
+        self.committed = 0
+        self.windows_done = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts watching the buffer on a worker thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self._process_ready_windows()
+            except Exception as e:
+                sanitized_error = sanitize_message(str(e))
+                logger.error(
+                    f"Streaming transcription window failed: {sanitized_error}",
+                    extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id},
+                    exc_info=True
+                )
+                return
+
+    def _process_ready_windows(self):
+        audio = self.audio_source()
+        while not self._stop_event.is_set() and len(audio) - self.committed >= self.window_samples:
+            window_end = self.committed + self.window_samples
+            search_start = max(self.committed + 1, window_end - self.search_samples)
+            cut = find_quiet_boundary(audio, search_start, window_end, self.frame_length)
+            self._transcribe_range(audio, cut)
+
+    def _transcribe_range(self, audio, end):
+        begin = max(0, self.committed - self.overlap_samples)
+        partial = self.transcribe_fn(audio[begin:end])
+        self.text = stitch_text(self.text, partial)
+        self.committed = end
+        self.windows_done += 1
+        logger.debug(
+            f"Streaming window {self.windows_done} transcribed up to sample {end}.",
+            extra={'correlation_id': self.correlation_id, 'trace_id': self.trace_id}
+        )
+
+    def finish(self, audio_data):
+        """Waits for the in-flight window, decodes the remaining tail and returns the full text."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        if len(audio_data) > self.committed:
+            self._transcribe_range(audio_data, len(audio_data))
+        return self.text
+
+    def cancel(self):
+        """Stops the worker without decoding the tail."""
+        self._stop_event.set()
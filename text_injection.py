@@ -0,0 +1,150 @@
+# text_injection.py
+
+import logging
+import queue
+import threading
+import time
+import tkinter as tk
+import keyboard
+from logger import sanitize_message
+from metrics import metrics
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# 'clipboard' pastes the whole text at once, 'keyboard' sends all key events
+# without delays, 'pyautogui' types one character at a time
+INJECTION_METHODS = ('clipboard', 'keyboard', 'pyautogui')
+
+# Marks the end of the queue when the injector is closed
+_STOP = object()
+
+class TextInjector:
+    """
+    Types transcriptions into the focused window on a dedicated thread.
+
+    Texts are injected one after another in the order they were queued, so
+    the transcription thread can move on to the next recording right away.
+    If the configured method fails, the text is typed with pyautogui instead.
+    """
+    def __init__(self, root, injection_config, correlation_id):
+        self.root = root
+        self.correlation_id = correlation_id
+        self.method = injection_config.get('method', 'clipboard')
+        if self.method not in INJECTION_METHODS:
+            raise ValueError(f"Unknown text injection method '{self.method}'. Use one of: {', '.join(INJECTION_METHODS)}")
+        self.paste_hotkey = injection_config.get('paste_hotkey', 'ctrl+v')
+        self.restore_clipboard = injection_config.get('restore_clipboard', True)
+        self.restore_delay = injection_config.get('restore_delay', 0.2)
+        self._queue = queue.Queue(maxsize=injection_config.get('max_queued', 20))
+        self._thread = threading.Thread(target=self._run, name="text-injector", daemon=True)
+        self._thread.start()
+
+    def inject(self, text):
+        """Queues text to be typed into the focused window."""
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            logger.error("Text injection queue is full; dropped a transcription.", extra={'correlation_id': self.correlation_id})
+
+    def _run(self):
+        while True:
+            text = self._queue.get()
+            if text is _STOP:
+                break
+            with metrics.span('text_injection', "Time to type the transcription into the focused window."):
+                try:
+                    self._inject(text)
+                except Exception as e:
+                    sanitized_error = sanitize_message(str(e))
+                    logger.warning(
+                        f"Text injection with '{self.method}' failed, typing instead: {sanitized_error}",
+                        extra={'correlation_id': self.correlation_id}
+                    )
+                    try:
+                        self._type(text)
+                    except Exception as e2:
+                        sanitized_error2 = sanitize_message(str(e2))
+                        logger.error(f"Text injection failed: {sanitized_error2}", extra={'correlation_id': self.correlation_id}, exc_info=True)
+
+    def _inject(self, text):
+        if self.method == 'clipboard':
+            self._paste(text)
+        elif self.method == 'keyboard':
+            # One event pair per character with no pause in between
+            keyboard.write(text, delay=0)
+        else:
+            self._type(text)
+
+    @staticmethod
+    def _type(text):
+        # pyautogui is slow to import and only needed for this method and the fallback
+        import pyautogui
+        pyautogui.write(text)
+
+    def _on_tk_thread(self, function, timeout=2.0):
+        """Runs `function` on the Tk main thread, which owns the clipboard, and returns its result."""
+        done = threading.Event()
+        outcome = {}
+
+        def call():
+            try:
+                outcome['result'] = function()
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                done.set()
+        self.root.after(0, call)
+        if not done.wait(timeout):
+            raise TimeoutError("The GUI thread did not respond in time.")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+    def _get_clipboard(self):
+        try:
+            return self.root.clipboard_get()
+        except tk.TclError:
+            # Empty, or holding something other than text
+            return None
+
+    def _set_clipboard(self, text):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+        self.root.update_idletasks()
+
+    def _paste(self, text):
+        previous = self._on_tk_thread(self._get_clipboard) if self.restore_clipboard else None
+        self._on_tk_thread(lambda: self._set_clipboard(text))
+        keyboard.send(self.paste_hotkey)
+        if previous is None:
+            return
+        # The target application reads the clipboard asynchronously after the paste keys
+        time.sleep(self.restore_delay)
+        try:
+            self._on_tk_thread(lambda: self._set_clipboard(previous))
+        except Exception as e:
+            # The text was already pasted; typing it again would duplicate it
+            sanitized_error = sanitize_message(str(e))
+            logger.warning(f"Failed to restore the clipboard: {sanitized_error}", extra={'correlation_id': self.correlation_id})
+
+    def close(self, timeout=5.0):
+        """Stops the injector after the texts already queued, waiting up to `timeout` seconds for them."""
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Text injection did not catch up before shutdown; queued text was not typed.", extra={'correlation_id': self.correlation_id})
+            return
+        # Pastes set the clipboard through the Tk thread; when closing from it, keep serving those calls
+        pump_events = threading.current_thread() is threading.main_thread()
+        while self._thread.is_alive() and time.monotonic() < deadline:
+            if pump_events:
+                try:
+                    self.root.update()
+                except tk.TclError:
+                    # The window is already gone
+                    pump_events = False
+            self._thread.join(0.05)
+        if self._thread.is_alive():
+            logger.warning("Text injection did not finish before shutdown; queued text was not typed.", extra={'correlation_id': self.correlation_id})
@@ -1,20 +1,63 @@
 # transcription.py
 
-import whisper
 import logging
+import os
+import threading
+import numpy as np
 from state import correlation_id
-import torch
 from logger import sanitize_message
+from utils import get_absolute_path
 
 # Set up module-specific logger
 logger = logging.getLogger(__name__)
 
-def load_whisper_model(model_name, correlation_id):
-    """Loads the specified Whisper model onto the GPU if available."""
+# Sample rate every backend expects its input audio at
+MODEL_SAMPLERATE = 16000
+
+class TranscriptionError(Exception):
+    """Custom exception for transcription backend errors."""
+    pass
+
+class TranscriptionResult:
+    """Text and segment details returned by a transcription backend."""
+    def __init__(self, text, segments=None, language=None):
+        self.text = text
+        self.segments = segments or []
+        self.language = language
+
+def load_whisper_model(model_name, correlation_id, cache_dir=None):
+    """
+    Loads the specified Whisper model onto the GPU if available.
+
+    With `cache_dir`, the weights are also kept as a local checkpoint that is
+    memory-mapped on later loads, which skips the download checksum pass and
+    only pages in weights as they are used.
+    """
+    # torch and whisper take seconds to import, so they are loaded with the
+    # first model rather than when the application starts
+    import torch
+    import whisper
     try:
         device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"Loading Whisper model: {model_name} on device: {device}", extra={'correlation_id': correlation_id})
-        model = whisper.load_model(model_name, device=device)
+        cached_path = os.path.join(get_absolute_path(cache_dir), f"whisper_{model_name}.pt") if cache_dir else None
+        model = None
+        if cached_path and os.path.exists(cached_path):
+            try:
+                model = _load_cached_whisper_model(model_name, cached_path, device)
+                logger.info(f"Whisper model '{model_name}' loaded from cache {cached_path}.", extra={'correlation_id': correlation_id})
+            except Exception as e:
+                # e.g. torch < 2.1, which cannot memory-map or assign weights
+                sanitized_error = sanitize_message(str(e))
+                logger.warning(
+                    f"Failed to load cached Whisper weights, loading '{model_name}' normally: {sanitized_error}",
+                    extra={'correlation_id': correlation_id}
+                )
+                model = whisper.load_model(model_name, device=device)
+        else:
+            model = whisper.load_model(model_name, device=device)
+            if cached_path:
+                _save_cached_whisper_model(model, cached_path, correlation_id)
         logger.info(f"Whisper model '{model_name}' loaded successfully on {device}.", extra={'correlation_id': correlation_id})
         return model
     except Exception as e:
@@ -26,7 +69,219 @@ def load_whisper_model(model_name, correlation_id):
         )
         raise
 
+def _load_cached_whisper_model(model_name, cached_path, device):
+    """
+    Rebuilds a Whisper model from a cached checkpoint, memory-mapping the weights.
+
+    The encoder and decoder are built on the meta device so no weights are
+    allocated until the memory-mapped ones are assigned. Needs torch 2.1 or
+    later.
+    """
+    import torch
+    import whisper
+    from whisper.model import AudioEncoder, TextDecoder, Whisper
+    checkpoint = torch.load(cached_path, map_location='cpu', mmap=True, weights_only=True)
+    dims = whisper.model.ModelDimensions(**checkpoint['dims'])
+    # Whisper.__init__ would also build its sparse alignment_heads, which the
+    # meta device does not support, so the submodules are built here instead
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device('meta'):
+        model.encoder = AudioEncoder(dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer)
+        model.decoder = TextDecoder(dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer)
+    model.load_state_dict(checkpoint['model_state_dict'], assign=True)
+    # Non-persistent buffers are not in the checkpoint and are rebuilt as Whisper builds them
+    model.decoder.register_buffer(
+        "mask", torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-np.inf).triu_(1), persistent=False
+    )
+    if model_name in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+    else:
+        # Whisper's default: the upper half of the text decoder layers
+        all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+        all_heads[dims.n_text_layer // 2:] = True
+        model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+    missing = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers()) if tensor.is_meta]
+    if missing:
+        raise RuntimeError(f"Cached checkpoint did not provide: {', '.join(missing)}")
+    return model.to(device)
+
+def _save_cached_whisper_model(model, cached_path, correlation_id):
+    """Writes a loaded model as a checkpoint that can be memory-mapped on the next load."""
+    import torch
+    try:
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        temp_path = cached_path + ".tmp"
+        torch.save({'dims': model.dims.__dict__, 'model_state_dict': model.state_dict()}, temp_path)
+        os.replace(temp_path, cached_path)
+        logger.info(f"Cached Whisper weights at {cached_path}.", extra={'correlation_id': correlation_id})
+    except Exception as e:
+        # The cache only speeds up later loads; the model itself is fine
+        sanitized_error = sanitize_message(str(e))
+        logger.warning(f"Failed to cache Whisper weights: {sanitized_error}", extra={'correlation_id': correlation_id})
+
 def check_model_availability(model_name):
     """Checks if the specified model is available."""
+    import whisper
     available_models = whisper.available_models()
     return model_name in available_models
+
+class TranscriptionBackend:
+    """
+    Base class for speech-to-text engines.
+
+    Subclasses load their model in `load` and turn 16 kHz mono float32 audio
+    into a TranscriptionResult in `transcribe`. In-process engines hold
+    `inference_lock` while decoding: the streaming transcriber and the
+    scheduler workers share one model, and openai-whisper installs its
+    kv-cache hooks on that model for each decode.
+    """
+    name = None
+
+    def __init__(self, model_name, options, correlation_id):
+        self.model_name = model_name
+        self.options = options
+        self.correlation_id = correlation_id
+        self.model = None
+        self.inference_lock = threading.Lock()
+
+    def load(self):
+        """Loads the model weights."""
+        raise NotImplementedError
+
+    def transcribe(self, audio):
+        """Transcribes a float32 numpy array and returns a TranscriptionResult."""
+        raise NotImplementedError
+
+    def warmup(self):
+        """Runs a short inference on silence so the first real request does not pay one-time setup costs."""
+        self.transcribe(np.zeros(MODEL_SAMPLERATE, dtype=np.float32))
+        logger.info(f"Backend '{self.name}' warmed up with model '{self.model_name}'.", extra={'correlation_id': self.correlation_id})
+
+    def close(self):
+        """Releases resources held by the backend."""
+        self.model = None
+
+class WhisperBackend(TranscriptionBackend):
+    """The reference openai-whisper engine, on the GPU when available."""
+    name = 'whisper'
+
+    def load(self):
+        self.model = load_whisper_model(self.model_name, self.correlation_id, self.options.get('cache_dir'))
+        self.device = self.model.device
+
+    def transcribe(self, audio):
+        import torch
+        # Move audio data to the same device as the model
+        audio_tensor = torch.from_numpy(audio).to(self.device)
+        with self.inference_lock:
+            result = self.model.transcribe(
+                audio_tensor,
+                fp16=self.options.get('fp16', False),
+                word_timestamps=self.options.get('word_timestamps', False)
+            )
+        segments = [
+            {
+                'start': segment['start'],
+                'end': segment['end'],
+                'text': segment['text'],
+                'avg_logprob': segment.get('avg_logprob'),
+                'no_speech_prob': segment.get('no_speech_prob'),
+                'words': [
+                    {'start': word['start'], 'end': word['end'], 'word': word['word'], 'probability': word.get('probability')}
+                    for word in segment.get('words') or []
+                ]
+            }
+            for segment in result.get('segments', [])
+        ]
+        return TranscriptionResult(result['text'], segments, result.get('language'))
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """CTranslate2 engine from faster-whisper, int8-quantized on the CPU by default."""
+    name = 'faster-whisper'
+
+    def load(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise TranscriptionError("The 'faster-whisper' backend requires the faster-whisper package.") from e
+        device = self.options.get('device', 'cpu')
+        compute_type = self.options.get('compute_type', 'int8')
+        logger.info(
+            f"Loading faster-whisper model: {self.model_name} on device: {device} ({compute_type})",
+            extra={'correlation_id': self.correlation_id}
+        )
+        self.model = WhisperModel(
+            self.model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=self.options.get('cpu_threads', 0),
+            download_root=self.options.get('download_root')
+        )
+        logger.info(f"faster-whisper model '{self.model_name}' loaded successfully.", extra={'correlation_id': self.correlation_id})
+
+    def transcribe(self, audio):
+        with self.inference_lock:
+            segment_iter, info = self.model.transcribe(
+                audio,
+                beam_size=self.options.get('beam_size', 1),
+                language=self.options.get('language'),
+                word_timestamps=self.options.get('word_timestamps', False)
+            )
+            # Segments are produced lazily; decoding happens while iterating
+            segments = [
+                {
+                    'start': segment.start,
+                    'end': segment.end,
+                    'text': segment.text,
+                    'avg_logprob': segment.avg_logprob,
+                    'no_speech_prob': segment.no_speech_prob,
+                    'words': [
+                        {'start': word.start, 'end': word.end, 'word': word.word, 'probability': word.probability}
+                        for word in segment.words or []
+                    ]
+                }
+                for segment in segment_iter
+            ]
+        text = ''.join(segment['text'] for segment in segments)
+        return TranscriptionResult(text, segments, info.language)
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+def create_backend(model_name, config, correlation_id):
+    """Creates the backend selected under `model_support` without loading it."""
+    model_support = config.get('model_support', {})
+    backend_name = model_support.get('backend', WhisperBackend.name)
+    if backend_name not in BACKENDS:
+        raise TranscriptionError(f"Unknown transcription backend '{backend_name}'. Available: {', '.join(BACKENDS)}")
+    options = dict(model_support.get('backend_options', {}).get(backend_name) or {})
+    options.setdefault('fp16', config.get('use_fp16', False))
+    options.setdefault('word_timestamps', config.get('confidence', {}).get('word_timestamps', True))
+    return BACKENDS[backend_name](model_name, options, correlation_id)
+
+def load_transcription_backend(model_name, config, correlation_id, in_process=False, use_cache=True):
+    """
+    Creates, loads and optionally warms up the configured backend.
+
+    When `model_support.worker_pool.enabled` is set the backend runs in worker
+    processes instead, unless `in_process` is given (as the workers do). With
+    `result_cache.enabled`, results of identical audio are reused from disk.
+    """
+    engine = create_backend(model_name, config, correlation_id)
+    if not in_process and config.get('model_support', {}).get('worker_pool', {}).get('enabled', False):
+        from worker_pool import WorkerPoolBackend  # Imported here to avoid a circular import
+        backend = WorkerPoolBackend(model_name, config, correlation_id)
+    else:
+        backend = engine
+    cache_config = config.get('result_cache', {})
+    if use_cache and cache_config.get('enabled', False):
+        from result_cache import CachedBackend, open_result_cache  # Imported here to avoid a circular import
+        backend = CachedBackend(backend, open_result_cache(cache_config), engine)
+    backend.load()
+    if config.get('model_support', {}).get('warmup', True):
+        backend.warmup()
+    return backend
@@ -0,0 +1,95 @@
+# vad.py
+
+import logging
+import numpy as np
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+# Keeps log10 finite on digital silence
+_EPSILON = 1e-10
+
+def frame_energy_db(audio, frame_length):
+    """Returns the RMS level of each complete frame in dBFS."""
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = audio[:frame_count * frame_length].reshape(frame_count, frame_length)
+    power = np.einsum('ij,ij->i', frames, frames) / frame_length
+    return 10.0 * np.log10(power + _EPSILON)
+
+def detect_speech(audio, samplerate, vad_config):
+    """
+    Marks frames that contain speech.
+
+    A frame is speech when its level is `threshold_margin_db` above the noise
+    floor, estimated as the 10th percentile of frame levels. The floor is
+    capped at `max_noise_floor_db` so a clip with no pauses at all is still
+    recognised as speech. Returns the boolean mask and the frame length.
+    """
+    frame_length = max(1, int(vad_config.get('frame_seconds', 0.02) * samplerate))
+    levels = frame_energy_db(audio, frame_length)
+    if len(levels) == 0:
+        return np.zeros(0, dtype=bool), frame_length
+    noise_floor = min(np.percentile(levels, 10), vad_config.get('max_noise_floor_db', -45))
+    speech = levels > noise_floor + vad_config.get('threshold_margin_db', 10)
+    # Pad speech on both sides so word onsets and decays are not clipped
+    padding = int(vad_config.get('padding_seconds', 0.2) * samplerate / frame_length)
+    if padding > 0 and speech.any():
+        counts = np.concatenate(([0], np.cumsum(speech, dtype=np.int32)))
+        index = np.arange(len(speech))
+        low = np.clip(index - padding, 0, len(speech))
+        high = np.clip(index + padding + 1, 0, len(speech))
+        speech = (counts[high] - counts[low]) > 0
+    return speech, frame_length
+
+def trim_silence(audio, samplerate, vad_config):
+    """
+    Cuts leading and trailing silence and shortens long internal pauses.
+
+    Pauses longer than `max_pause_seconds` are collapsed to that length.
+    Returns the trimmed audio and the kept segments as (start, end) sample
+    offsets into the original audio, in order. Both are empty when no speech
+    was found.
+    """
+    speech, frame_length = detect_speech(audio, samplerate, vad_config)
+    if not speech.any():
+        return audio[:0], []
+
+    # Run boundaries in frames: starts and ends of contiguous speech
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    keep_pause = int(vad_config.get('max_pause_seconds', 0.5) * samplerate)
+    segments = []
+    for start_frame, end_frame in zip(starts, ends):
+        start = int(start_frame) * frame_length
+        end = min(len(audio), int(end_frame) * frame_length)
+        if segments:
+            previous_start, previous_end = segments[-1]
+            if start - previous_end <= keep_pause:
+                # Short pause: keep it in full by extending the previous segment
+                segments[-1] = (previous_start, end)
+                continue
+            # Long pause: keep half of the allowed pause on each side of the gap
+            half = keep_pause // 2
+            segments[-1] = (previous_start, previous_end + half)
+            start -= keep_pause - half
+        segments.append((start, end))
+
+    trimmed = np.concatenate([audio[start:end] for start, end in segments])
+    logger.debug(f"VAD kept {len(trimmed)} of {len(audio)} samples in {len(segments)} segments.")
+    return trimmed, segments
+
+def map_to_original(sample, segments):
+    """Maps a sample offset in trimmed audio back to the original recording."""
+    offset = 0
+    for start, end in segments:
+        length = end - start
+        if sample < offset + length:
+            return start + (sample - offset)
+        offset += length
+    if segments:
+        return segments[-1][1]
+    return sample
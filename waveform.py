@@ -0,0 +1,136 @@
+# waveform.py
+
+import tkinter as tk
+import numpy as np
+from capture import to_float32
+
+class WaveformRenderer:
+    """
+    Draws a live min/max envelope of the recording on a Tk canvas.
+
+    The timeline is split into a fixed number of columns. Each update only
+    folds the samples that arrived since the previous update into the
+    envelope and redraws the columns they touched, so the cost of a frame
+    does not grow with the length of the recording. When the recording
+    outgrows the timeline, adjacent columns are merged and the span doubles.
+    """
+    def __init__(self, parent, samples_per_second, columns=800, initial_seconds=10, height=150):
+        self.samples_per_second = samples_per_second
+        self.columns = columns
+        self.initial_seconds = initial_seconds
+        self.canvas = tk.Canvas(parent, height=height, background='white', highlightthickness=0)
+        self.canvas.bind('<Configure>', self._on_resize)
+        self.width = 1
+        self.height = height
+        self._items = [None] * columns
+        self._axis = self.canvas.create_line(0, 0, 0, 0, fill='#cccccc')
+        self._label = self.canvas.create_text(0, 0, anchor='ne', fill='#666666', font=("Helvetica", 8))
+        self.reset()
+
+    def reset(self):
+        """Clears the envelope for a new recording."""
+        self.samples_per_column = max(1, int(self.initial_seconds * self.samples_per_second / self.columns))
+        self.mins = np.zeros(self.columns, dtype=np.float32)
+        self.maxs = np.zeros(self.columns, dtype=np.float32)
+        self.processed = 0
+        # Peak level used for auto gain; the floor keeps silence from filling the view
+        self.peak = 0.05
+        for index, item in enumerate(self._items):
+            if item is not None:
+                self.canvas.delete(item)
+                self._items[index] = None
+        self._update_label()
+
+    def update(self, samples):
+        """Folds in samples beyond those already drawn and redraws the affected columns."""
+        if len(samples) < self.processed:
+            # A new recording replaced the one being drawn
+            self.reset()
+        if len(samples) == self.processed:
+            return
+        first_column = self.processed // self.samples_per_column
+        # Integer PCM is scaled to [-1, 1) so the envelope and the peak floor share one unit
+        new_samples = to_float32(samples[self.processed:])
+        new_peak = max(float(new_samples.max()), -float(new_samples.min()))
+        redraw_all = self._append(new_samples)
+        if new_peak > self.peak:
+            self.peak = new_peak
+            redraw_all = True
+        last_column = min(self.columns - 1, (self.processed - 1) // self.samples_per_column)
+        if redraw_all:
+            self._draw_columns(0, last_column)
+            self._update_label()
+        else:
+            self._draw_columns(first_column, last_column)
+
+    def _append(self, new_samples):
+        """Updates the envelope from new samples. Returns True if the timeline was rescaled."""
+        rescaled = False
+        position = self.processed
+        while len(new_samples):
+            column = position // self.samples_per_column
+            if column >= self.columns:
+                self._zoom_out()
+                rescaled = True
+                continue
+            offset = position % self.samples_per_column
+            if offset:
+                # Finish the column that the previous update left partly filled
+                chunk = new_samples[:self.samples_per_column - offset]
+                self.mins[column] = min(self.mins[column], chunk.min())
+                self.maxs[column] = max(self.maxs[column], chunk.max())
+            else:
+                full = min(len(new_samples) // self.samples_per_column, self.columns - column)
+                if full:
+                    chunk = new_samples[:full * self.samples_per_column]
+                    block = chunk.reshape(full, self.samples_per_column)
+                    self.mins[column:column + full] = block.min(axis=1)
+                    self.maxs[column:column + full] = block.max(axis=1)
+                else:
+                    chunk = new_samples
+                    self.mins[column] = chunk.min()
+                    self.maxs[column] = chunk.max()
+            position += len(chunk)
+            new_samples = new_samples[len(chunk):]
+        self.processed = position
+        return rescaled
+
+    def _zoom_out(self):
+        """Doubles the time span by merging adjacent columns."""
+        half = self.columns // 2
+        self.mins[:half] = np.minimum(self.mins[0:2 * half:2], self.mins[1:2 * half:2])
+        self.maxs[:half] = np.maximum(self.maxs[0:2 * half:2], self.maxs[1:2 * half:2])
+        self.mins[half:] = 0
+        self.maxs[half:] = 0
+        self.samples_per_column *= 2
+        for index in range(half, self.columns):
+            if self._items[index] is not None:
+                self.canvas.delete(self._items[index])
+                self._items[index] = None
+
+    def _draw_columns(self, first, last):
+        middle = self.height / 2
+        scale = (self.height / 2 - 2) / self.peak
+        column_width = self.width / self.columns
+        for index in range(first, last + 1):
+            x = index * column_width
+            top = middle - self.maxs[index] * scale
+            bottom = middle - self.mins[index] * scale + 1
+            item = self._items[index]
+            if item is None:
+                self._items[index] = self.canvas.create_line(x, top, x, bottom, fill='#1f77b4')
+            else:
+                self.canvas.coords(item, x, top, x, bottom)
+
+    def _update_label(self):
+        seconds = self.samples_per_column * self.columns / self.samples_per_second
+        self.canvas.itemconfig(self._label, text=f"{seconds:.0f} s")
+
+    def _on_resize(self, event):
+        self.width = max(1, event.width)
+        self.height = max(1, event.height)
+        self.canvas.coords(self._axis, 0, self.height / 2, self.width, self.height / 2)
+        self.canvas.coords(self._label, self.width - 4, 4)
+        if self.processed:
+            last_column = min(self.columns - 1, (self.processed - 1) // self.samples_per_column)
+            self._draw_columns(0, last_column)
@@ -0,0 +1,219 @@
+# worker_pool.py
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import numpy as np
+from logger import sanitize_message
+from transcription import TranscriptionBackend, TranscriptionError, load_transcription_backend
+
+# Set up module-specific logger
+logger = logging.getLogger(__name__)
+
+def _worker_main(index, model_name, config, correlation_id, jobs, results, current_job):
+    """Entry point of a worker process: loads the model once and serves jobs until told to stop."""
+    try:
+        backend = load_transcription_backend(model_name, config, correlation_id, in_process=True, use_cache=False)
+    except Exception as e:
+        results.put(('load_error', index, sanitize_message(str(e))))
+        return
+    results.put(('ready', index, None))
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, shm_name, length = job
+        # Written directly to shared memory so the parent sees it even if we crash mid-job
+        current_job.value = job_id
+        shm = shared_memory.SharedMemory(name=shm_name)
+        audio = np.ndarray((length,), dtype=np.float32, buffer=shm.buf)
+        try:
+            results.put(('done', job_id, backend.transcribe(audio)))
+        except Exception as e:
+            results.put(('failed', job_id, sanitize_message(str(e))))
+        finally:
+            # The array must be released before the shared memory can be closed
+            del audio
+            shm.close()
+            current_job.value = -1
+
+class WorkerPoolBackend(TranscriptionBackend):
+    """
+    Runs the configured backend in long-lived worker processes.
+
+    Inference then no longer competes with Tk, the key listener and the audio
+    callback for the GIL. Audio is handed over through shared memory instead
+    of being pickled, jobs wait in a bounded queue, and a worker that dies is
+    restarted while its in-flight job fails instead of hanging.
+    """
+    name = 'worker-pool'
+
+    def __init__(self, model_name, config, correlation_id):
+        super().__init__(model_name, config.get('model_support', {}).get('worker_pool', {}), correlation_id)
+        self.config = config
+        self._context = multiprocessing.get_context('spawn')
+        self._jobs = self._context.Queue(maxsize=self.options.get('max_queued_jobs', 4))
+        self._results = self._context.Queue()
+        self._workers = {}
+        self._current_jobs = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._restarts = 0
+        self._closed = False
+        self._broken = False
+
+    def _start_worker(self, index):
+        self._current_jobs[index] = self._context.Value('q', -1, lock=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self.model_name, self.config, self.correlation_id, self._jobs, self._results, self._current_jobs[index]),
+            name=f"transcription-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        self._workers[index] = process
+
+    def load(self):
+        """Starts the workers and waits until each has loaded the model."""
+        for index in range(self.options.get('processes', 1)):
+            self._start_worker(index)
+        deadline = time.monotonic() + self.options.get('load_timeout', 600)
+        ready = 0
+        while ready < len(self._workers):
+            try:
+                kind, index, detail = self._results.get(timeout=1)
+            except queue.Empty:
+                if any(not process.is_alive() for process in self._workers.values()):
+                    self.close()
+                    raise TranscriptionError(f"A transcription worker exited while loading model '{self.model_name}'.")
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise TranscriptionError(f"Transcription workers did not load model '{self.model_name}' in time.")
+                continue
+            if kind == 'ready':
+                ready += 1
+            elif kind == 'load_error':
+                self.close()
+                raise TranscriptionError(f"Transcription worker failed to load model '{self.model_name}': {detail}")
+        logger.info(
+            f"{ready} transcription worker(s) ready with model '{self.model_name}'.",
+            extra={'correlation_id': self.correlation_id}
+        )
+        threading.Thread(target=self._collect_results, daemon=True).start()
+        threading.Thread(target=self._monitor_workers, daemon=True).start()
+
+    def warmup(self):
+        # Each worker warms up its own model right after loading it
+        pass
+
+    @property
+    def pending_jobs(self):
+        """Number of submitted jobs that have not finished yet."""
+        return len(self._pending)
+
+    def submit(self, audio):
+        """Queues audio for transcription and returns a Future for the TranscriptionResult."""
+        if self._broken or self._closed:
+            raise TranscriptionError("Transcription workers are not available.")
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        staging = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+        staging[:] = audio
+        del staging
+        job_id = next(self._job_ids)
+        future = Future()
+        with self._lock:
+            self._pending[job_id] = (future, shm)
+        try:
+            # Blocks while the queue is full, which throttles producers
+            self._jobs.put((job_id, shm.name, len(audio)), timeout=self.options.get('submit_timeout', 30))
+        except queue.Full:
+            self._finish_job(job_id, error=TranscriptionError("Transcription queue is full."))
+            raise TranscriptionError("Transcription queue is full.")
+        return future
+
+    def transcribe(self, audio):
+        return self.submit(audio).result(timeout=self.options.get('job_timeout', 300))
+
+    def _finish_job(self, job_id, result=None, error=None):
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+        if entry is None:
+            return
+        future, shm = entry
+        shm.close()
+        shm.unlink()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _collect_results(self):
+        while not self._closed:
+            try:
+                kind, key, detail = self._results.get(timeout=1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if kind == 'done':
+                self._finish_job(key, result=detail)
+            elif kind == 'failed':
+                self._finish_job(key, error=TranscriptionError(f"Transcription failed in worker: {detail}"))
+            elif kind == 'ready':
+                logger.info(f"Transcription worker {key} restarted and ready.", extra={'correlation_id': self.correlation_id})
+            elif kind == 'load_error':
+                logger.error(
+                    f"Restarted transcription worker {key} failed to load the model: {detail}",
+                    extra={'correlation_id': self.correlation_id}
+                )
+
+    def _monitor_workers(self):
+        max_restarts = self.options.get('max_restarts', 3)
+        interval = self.options.get('health_check_interval', 1.0)
+        while not self._closed:
+            time.sleep(interval)
+            for index, process in list(self._workers.items()):
+                if self._closed or process.is_alive():
+                    continue
+                logger.error(
+                    f"Transcription worker {index} exited unexpectedly with code {process.exitcode}.",
+                    extra={'correlation_id': self.correlation_id}
+                )
+                job_id = self._current_jobs[index].value
+                if job_id >= 0:
+                    self._finish_job(job_id, error=TranscriptionError("Transcription worker exited unexpectedly."))
+                if self._restarts < max_restarts:
+                    self._restarts += 1
+                    self._start_worker(index)
+                else:
+                    del self._workers[index]
+                    if not self._workers:
+                        self._broken = True
+                        logger.critical(
+                            "All transcription workers have failed; giving up after repeated restarts.",
+                            extra={'correlation_id': self.correlation_id}
+                        )
+
+    def close(self):
+        """Stops the workers and fails any jobs still waiting."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            try:
+                self._jobs.put(None, timeout=1)
+            except queue.Full:
+                break
+        for process in self._workers.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for job_id in list(self._pending):
+            self._finish_job(job_id, error=TranscriptionError("Transcription workers were shut down."))